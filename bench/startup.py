@@ -0,0 +1,69 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# startup benchmark: time importing the deck and evaluator modules, then the first
+# evaluation (which is when the lookup tables get built or loaded), in fresh interpreters.
+#
+#      python bench/startup.py [runs]
+#
+# runs once with the tables built from scratch and once with a prebuilt table file
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+import deck.deck
+import eval.pokerhand
+import eval.batch
+imported = time.perf_counter()
+eval.batch.evaluate_hand([48, 44, 40, 36, 32, 0, 1])
+evaluated = time.perf_counter()
+print(json.dumps([imported - start, evaluated - imported]))
+"""
+
+def run_child(env):
+    out = subprocess.check_output([sys.executable, '-c', CHILD], cwd=ROOT, env=env)
+    return json.loads(out.decode('ascii'))
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+def measure(runs, table_path):
+    env = dict(os.environ)
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    env.pop('PYPOKER_TABLES', None)
+    if table_path is not None:
+        env['PYPOKER_TABLES'] = table_path
+    samples = [run_child(env) for i in range(runs)]
+    return median([s[0] for s in samples]), median([s[1] for s in samples])
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 11
+    sys.path.insert(0, ROOT)
+    from eval.maskeval import DEFAULT_TABLE_PATH, save_tables
+
+    if os.path.exists(DEFAULT_TABLE_PATH):
+        print("note: {0} exists, so the cold run loads it too".format(DEFAULT_TABLE_PATH))
+
+    scratch = tempfile.mkdtemp()
+    try:
+        table_path = os.path.join(scratch, 'tables.bin')
+        cold = measure(runs, None)
+        save_tables(table_path)
+        warm = measure(runs, table_path)
+    finally:
+        for name in os.listdir(scratch):
+            os.remove(os.path.join(scratch, name))
+        os.rmdir(scratch)
+
+    for label, (imported, evaluated) in (('built tables', cold), ('prebuilt tables', warm)):
+        print("{0:16s} import {1:6.2f}ms  first evaluation {2:6.2f}ms  total {3:6.2f}ms".format(
+                label, imported * 1000, evaluated * 1000, (imported + evaluated) * 1000))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+# without this python 2 reads 'deck' below as the sibling module deck/deck.py
+from __future__ import absolute_import
+import array
+from deck.deck import DECK_SIZE
+
+# colex ranking of k card subsets of the deck.  a set of canonical card indices
+# c1 < c2 < ... < ck has rank C(c1, 1) + C(c2, 2) + ... + C(ck, k), which numbers the
+# C(52, k) subsets densely from 0 (1326 hole card pairs, 22100 flops, 2598960 five card hands)
+# so per-hand results can live in flat arrays instead of dicts keyed on card tuples
+
+def build_binomial():
+    """ build the table of binomial coefficients, table[k][n] = C(n, k) for 0 <= n, k <= 52 """
+    table = [[0] * (DECK_SIZE + 1) for k in range(DECK_SIZE + 1)]
+    for n in range(DECK_SIZE + 1):
+        table[0][n] = 1
+        for k in range(1, n + 1):
+            table[k][n] = table[k - 1][n - 1] + table[k][n - 1]
+    return table
+
+Binomial = build_binomial()
+
+# ranks of large subsets don't fit in 32 bits
+try:
+    RANK_TYPECODE = 'q'
+    array.array(RANK_TYPECODE)
+except ValueError:
+    RANK_TYPECODE = 'l'
+
+def num_subsets(k):
+    """ the number of k card subsets of the deck, one more than the largest rank """
+    return Binomial[k][DECK_SIZE]
+
+def rank_cards(cards):
+    """ return the colex rank of a set of canonical card indices, in any order """
+    ordered = sorted(cards)
+    rank = 0
+    last = -1
+    for i, card in enumerate(ordered):
+        if (card <= last) or (card >= DECK_SIZE):
+            raise ValueError("bad or repeated card index {0} in {1}".format(card, list(cards)))
+        rank += Binomial[i + 1][card]
+        last = card
+    return rank
+
+def rank_mask(mask):
+    """ return the colex rank of the cards in a 52 bit card mask """
+    if (mask < 0) or (mask >> DECK_SIZE):
+        raise ValueError("card mask {0:#x} has bits outside the deck".format(mask))
+    rank = 0
+    i = 1
+    card = 0
+    while mask:
+        if mask & 1:
+            rank += Binomial[i][card]
+            i += 1
+        mask >>= 1
+        card += 1
+    return rank
+
+def unrank_cards(rank, k):
+    """ return the ascending list of card indices with the given colex rank among k card sets """
+    if (rank < 0) or (rank >= num_subsets(k)):
+        raise ValueError("rank {0} is out of range for {1} card sets".format(rank, k))
+
+    cards = [0] * k
+    card = DECK_SIZE - 1
+    for i in range(k, 0, -1):
+        # largest card with C(card, i) <= rank; cards only get smaller as i drops
+        row = Binomial[i]
+        while row[card] > rank:
+            card -= 1
+        cards[i - 1] = card
+        rank -= row[card]
+        card -= 1
+    return cards
+
+def unrank_mask(rank, k):
+    """ return the 52 bit card mask with the given colex rank among k card sets """
+    mask = 0
+    for card in unrank_cards(rank, k):
+        mask |= 1 << card
+    return mask
+
+def rank_many(indices, k):
+    """ rank a flat sequence of card indices holding consecutive k card hands (as returned by
+    deck.parse_many for fixed size hands).  returns an array of ranks, one per hand """
+    if len(indices) % k:
+        raise ValueError("{0} card indices don't split into {1} card hands".format(len(indices), k))
+
+    rows = Binomial[1:k + 1]
+    ranks = array.array(RANK_TYPECODE)
+    append = ranks.append
+
+    if k == 2:
+        row1, row2 = rows
+        for j in range(0, len(indices), 2):
+            a = indices[j]
+            b = indices[j + 1]
+            if a > b:
+                a, b = b, a
+            if (a == b) or (a < 0) or (b >= DECK_SIZE):
+                raise ValueError("bad card pair {0}, {1} at hand {2}".format(a, b, j // 2))
+            append(row1[a] + row2[b])
+        return ranks
+
+    for j in range(0, len(indices), k):
+        append(rank_cards(indices[j:j + k]))
+    return ranks
+
+def rank_masks(masks):
+    """ return an array with the colex rank of each card mask """
+    return array.array(RANK_TYPECODE, [rank_mask(mask) for mask in masks])
+
+# flat unrank tables for the small set sizes, built the first time they are needed
+UnrankTables = {}
+UNRANK_TABLE_MAX = 3
+
+def unrank_table(k):
+    """ return a flat array holding the cards of every k card set in rank order """
+    table = UnrankTables.get(k)
+    if table is None:
+        table = array.array('b')
+        for rank in range(num_subsets(k)):
+            table.extend(unrank_cards(rank, k))
+        UnrankTables[k] = table
+    return table
+
+def unrank_many(ranks, k):
+    """ unrank a sequence of ranks of k card sets into a flat array of card indices, k per set """
+    count = num_subsets(k)
+    for rank in ranks:
+        if (rank < 0) or (rank >= count):
+            raise ValueError("rank {0} is out of range for {1} card sets".format(rank, k))
+
+    cards = array.array('b')
+    if k <= UNRANK_TABLE_MAX:
+        table = unrank_table(k)
+        for rank in ranks:
+            start = rank * k
+            cards.extend(table[start:start + k])
+        return cards
+
+    for rank in ranks:
+        cards.extend(unrank_cards(rank, k))
+    return cards
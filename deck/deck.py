@@ -1,13 +1,30 @@
 import array
 import random
-import string
 
 DBShortCardNames = [ '2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A' ];
 DBShortSuitNames = [ 'c', 'd', 'h', 's' ];
 DBLongSuitNames = ['Clubs', 'Diamonds', 'Hearts', 'Spades']
 DBLongCardNames = [ "Deuce", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine", "Ten", "Jack", "Queen", "King", "Ace" ];
 DECK_SIZE = 52
-DBSingleNames = string.ascii_lowercase + string.ascii_uppercase
+# community cards on a complete hold'em board
+BOARD_SIZE = 5
+# string.ascii_lowercase + string.ascii_uppercase, spelled out since importing string pulls in re
+DBSingleNames = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+def build_short_name_index():
+    """ build the table mapping every two character card name, in any case, to its canonical index """
+    table = {}
+    for value, value_name in enumerate(DBShortCardNames):
+        for suit, suit_name in enumerate(DBShortSuitNames):
+            for v in (value_name.upper(), value_name.lower()):
+                for s in (suit_name.upper(), suit_name.lower()):
+                    table[v + s] = (value * 4) + suit
+    return table
+
+DBShortNameIndex = build_short_name_index()
+
+class CardParseError(ValueError):
+    """ raised by the bulk parsers when a card name is malformed, unknown or repeated """
 
 class Card:
     # constants for the card values.  to pack the values, the face values do not match the constants
@@ -76,7 +93,7 @@ class Card:
 
     def set_card_by_index(self, index):
         """ set the card's value by canonical index"""
-        self.value = (index / 4)
+        self.value = (index // 4)
         self.suit = (index % 4)
         return self.is_valid()
     
@@ -100,20 +117,12 @@ class Card:
 
     def set_card_by_short_name(self, cardname):
         """ set the card's value and suit by two character card name ('As' = 'Ace of spades')"""
-        if len(cardname) != 2:
+        index = DBShortNameIndex.get(cardname)
+        if index is None:
             return -1
 
-        valname = cardname.upper()[0]
-        suitname = cardname.lower()[1]
-
-        if valname not in DBShortCardNames:
-            return -1
-
-        if suitname not in DBShortSuitNames:
-            return -1
-
-        self.value = DBShortCardNames.index(valname)
-        self.suit = DBShortSuitNames.index(suitname)
+        self.value = index // 4
+        self.suit = index % 4
 
 class Deck:
 
@@ -152,6 +161,22 @@ class Deck:
             return -1
         self.pile.remove(index)
 
+    def take_cards(self, to_remove):
+        """ remove a set of cards (card objects or canonical indices) from the deck in one
+        pass.  if any of them isn't in the deck, nothing is removed and -1 is returned """
+        remove_mask = 0
+        for card in to_remove:
+            index = card.get_index() if isinstance(card, Card) else card
+            remove_mask |= 1 << index
+
+        pile_mask = 0
+        for index in self.pile:
+            pile_mask |= 1 << index
+        if remove_mask & ~pile_mask:
+            return -1
+
+        self.pile = array.array('i', [index for index in self.pile if not ((remove_mask >> index) & 1)])
+
     def sample_cards(self, to_sample):
         """ pull the top to_sample cards off the top of the deck, then replace """
         
@@ -186,8 +211,70 @@ class Deck:
         
         return True
 
-        
+def card_text(buf):
+    """ turn a bytes buffer into a string the name table can be indexed with """
+    if isinstance(buf, bytearray):
+        buf = bytes(buf)
+    if isinstance(buf, bytes) and not isinstance(buf, str):
+        buf = buf.decode('latin-1')
+    return buf
 
+def parse_cards(cards):
+    """ parse a string (or bytes) of two character card names ('AhKs') into an array of
+    canonical indices.  raises CardParseError on a bad or repeated card """
+    cards = card_text(cards)
 
+    if len(cards) % 2:
+        raise CardParseError("card string {0!r} has an odd length".format(cards))
 
-    
+    names = [cards[i:i + 2] for i in range(0, len(cards), 2)]
+    try:
+        indices = array.array('i', map(DBShortNameIndex.__getitem__, names))
+    except KeyError as e:
+        raise CardParseError("unknown card {0!r} in {1!r}".format(e.args[0], cards))
+
+    # a 52 bit mask catches repeats without scanning what we've parsed so far
+    seen = 0
+    for index in indices:
+        bit = 1 << index
+        if seen & bit:
+            raise CardParseError("card {0!r} appears twice in {1!r}".format(
+                    DBShortCardNames[index // 4] + DBShortSuitNames[index % 4], cards))
+        seen |= bit
+
+    return indices
+
+def card_indices(cards):
+    """ turn a string of card names, or a sequence of Cards / names / indices, into a list of
+    canonical indices """
+    if isinstance(cards, (str, bytes, bytearray)):
+        return list(parse_cards(cards))
+
+    out = []
+    for x in cards:
+        if isinstance(x, Card):
+            out.append(x.get_index())
+        elif isinstance(x, str):
+            out.extend(parse_cards(x))
+        else:
+            out.append(x)
+    return out
+
+def parse_many(source):
+    """ parse many hands in one call.  source is either a list of card strings or a single
+    string/bytes buffer of whitespace separated hands ('AhKs QdQc\\n...').  returns a pair of
+    arrays (indices, offsets) where hand i is indices[offsets[i]:offsets[i + 1]] """
+    source = card_text(source)
+    if isinstance(source, str):
+        source = source.split()
+
+    indices = array.array('i')
+    offsets = array.array('i', [0])
+    for hand_number, cards in enumerate(source):
+        try:
+            indices.extend(parse_cards(cards))
+        except CardParseError as e:
+            raise CardParseError("hand {0}: {1}".format(hand_number, e))
+        offsets.append(len(indices))
+
+    return indices, offsets
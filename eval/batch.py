@@ -0,0 +1,47 @@
+from deck.deck import DECK_SIZE
+from eval.maskeval import Evaluator
+from eval.pokerhand import PokerHand
+
+# batch evaluation entry points.  callers that need to resolve many hands at once (simulated
+# tables, equity jobs) hand over plain lists of canonical card indices or card masks, which
+# keeps the work cheap to ship to another thread or process.  a shared result cache can be
+# installed (SharedTables.install) and is checked before anything is evaluated
+
+ResultCache = None
+
+def evaluate_mask(mask):
+    """ return the canonical value of a 52 bit card mask, from the installed cache if it has it """
+    cache = ResultCache
+    if cache is not None:
+        value = cache.lookup(mask)
+        if value >= 0:
+            return value
+    return Evaluator.evaluate_mask(mask)
+
+def evaluate_hand(cards):
+    """ return the canonical value of a set of cards (card objects, names or indices), -1 if
+    the cards can't be added to a hand """
+    # plain index lists skip the Hand and go straight to the mask evaluator
+    seen = 0
+    for x in cards:
+        if (not isinstance(x, int)) or (x < 0) or (x >= DECK_SIZE) or (seen & (1 << x)):
+            break
+        seen |= 1 << x
+    else:
+        if ResultCache is not None:
+            return evaluate_mask(seen)
+        return Evaluator.evaluate_cards(cards)
+
+    hand = PokerHand()
+    if hand.add_cards(cards, None) == -1:
+        return -1
+    return hand.get_hand_value().get_canonical()
+
+def evaluate_hands(hands):
+    """ return a list with the canonical value of each set of cards in hands """
+    return [evaluate_hand(cards) for cards in hands]
+
+def evaluate_masks(masks):
+    """ return a list with the canonical value of each 52 bit card mask """
+    evaluate = Evaluator.evaluate_mask if ResultCache is None else evaluate_mask
+    return [evaluate(mask) for mask in masks]
@@ -0,0 +1,95 @@
+import itertools
+from deck.deck import BOARD_SIZE, DECK_SIZE, card_indices, parse_many
+from eval.handvalue import HandValue
+from eval.maskeval import Evaluator, suit_masks
+
+# hand category distributions for a range of hole card combos on a partial board.  every
+# runout of the board is dealt once and the whole range is typed against it in one pass,
+# reading the category straight from the mask evaluator's fields, so nothing but a count
+# is kept per (combo, runout) pair
+
+class CategoryHistogram:
+    """ counts of final hand categories, indexed by the HandValue HV_ types (index 0 unused).
+    counts[i] belongs to combos[i]; total is the sum over the whole range """
+
+    def __init__(self, combos, counts):
+        self.combos = combos
+        self.counts = counts
+        self.total = [sum(column) for column in zip(*counts)] if counts \
+            else [0] * (HandValue.HV_STR_FLUSH + 1)
+
+    def fraction(self, hand_type, combo=None):
+        """ fraction of outcomes (for the whole range, or the combo with the given index) that
+        end up exactly hand_type """
+        counts = self.total if combo is None else self.counts[combo]
+        outcomes = sum(counts)
+        return (float(counts[hand_type]) / outcomes) if outcomes else 0.0
+
+    def fraction_at_least(self, hand_type, combo=None):
+        """ fraction of outcomes that end up hand_type or better """
+        counts = self.total if combo is None else self.counts[combo]
+        outcomes = sum(counts)
+        return (float(sum(counts[hand_type:])) / outcomes) if outcomes else 0.0
+
+def range_combos(combos):
+    """ turn a range (a whitespace separated string of combos like 'AhKh QsQc', or a sequence
+    of card strings / index pairs) into a list of index lists """
+    if isinstance(combos, (str, bytes, bytearray)):
+        indices, offsets = parse_many(combos)
+        return [list(indices[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)]
+    return [card_indices(combo) for combo in combos]
+
+def category_histogram(board, combos, dead=()):
+    """ enumerate every runout of board to the river for every combo in the range.  combos
+    that share a card with the board or the dead cards are dropped from the result """
+    board = card_indices(board)
+    dead = card_indices(dead)
+    if len(board) > BOARD_SIZE:
+        raise ValueError("a board has at most {0} cards".format(BOARD_SIZE))
+
+    used = 0
+    for card in board + dead:
+        if (card < 0) or (card >= DECK_SIZE) or (used & (1 << card)):
+            raise ValueError("bad or repeated card index {0}".format(card))
+        used |= 1 << card
+
+    kept = []
+    info = []
+    for combo in range_combos(combos):
+        mask = 0
+        for card in combo:
+            if (card < 0) or (card >= DECK_SIZE) or (mask & (1 << card)):
+                raise ValueError("bad or repeated card index {0} in combo".format(card))
+            mask |= 1 << card
+        if mask & used:
+            continue
+        kept.append(combo)
+        info.append([mask] + suit_masks(combo))
+
+    counts = [[0] * (HandValue.HV_STR_FLUSH + 1) for combo in kept]
+    stub = [card for card in range(DECK_SIZE) if not (used & (1 << card))]
+    board_masks = suit_masks(board)
+    hand_fields = Evaluator.hand_fields
+
+    for runout in itertools.combinations(stub, BOARD_SIZE - len(board)):
+        c, d, h, s = board_masks
+        runout_mask = 0
+        for card in runout:
+            runout_mask |= 1 << card
+            bit = 1 << (card >> 2)
+            suit = card & 3
+            if suit == 0:
+                c |= bit
+            elif suit == 1:
+                d |= bit
+            elif suit == 2:
+                h |= bit
+            else:
+                s |= bit
+
+        for row, (mask, cc, cd, ch, cs) in zip(counts, info):
+            if mask & runout_mask:
+                continue
+            row[hand_fields(c | cc, d | cd, h | ch, s | cs)[0]] += 1
+
+    return CategoryHistogram(kept, counts)
@@ -0,0 +1,147 @@
+import array
+from deck.deck import Card, DBShortNameIndex, DECK_SIZE
+from eval.maskeval import Evaluator, card_mask_to_suit_masks
+from eval.pokerhand import PokerHand
+
+# a hand kept as two integers instead of a list of Card objects and count arrays:
+#      mask = 52 bit card mask, bit n set when the card with canonical index n is held
+#      suit_ranks = the four 13 bit per-suit rank masks packed 16 bits apart, clubs lowest
+
+SUIT_SHIFT = 16
+RANK_BITS = (1 << 13) - 1
+
+def pack_suit_masks(masks):
+    """ pack four per-suit rank masks into a single integer """
+    return masks[0] | (masks[1] << 16) | (masks[2] << 32) | (masks[3] << 48)
+
+class CompactHand(object):
+    """ a slotted hand that evaluates like a PokerHand """
+    __slots__ = ('mask', 'suit_ranks')
+
+    def __init__(self, mask=0):
+        self.mask = mask
+        self.suit_ranks = pack_suit_masks(card_mask_to_suit_masks(mask))
+
+    @classmethod
+    def from_hand(cls, hand):
+        """ build a compact hand holding the same cards as a Hand """
+        return cls(hand.mask)
+
+    def to_hand(self, hand_class=PokerHand):
+        """ build a Hand (a PokerHand by default) holding the same cards """
+        hand = hand_class()
+        hand.add_cards(self.card_indices(), None)
+        return hand
+
+    def add_cards(self, new_cards, use_deck=None):
+        """ add card objects, two character names or canonical indices (or a string of names)
+        to the hand, taking them from use_deck if one is given.  like Hand.add_cards, stops and
+        returns -1 on a bad or duplicate card """
+        to_add = new_cards
+        if isinstance(new_cards, str):
+            to_add = [new_cards[i:i + 2] for i in range(0, len(new_cards) - 1, 2)]
+
+        for x in to_add:
+            if isinstance(x, Card) and x.is_valid():
+                index = x.get_index()
+            elif isinstance(x, int) and (x > -1) and (x < DECK_SIZE):
+                index = x
+            elif isinstance(x, str) and (x in DBShortNameIndex):
+                index = DBShortNameIndex[x]
+            else:
+                return -1
+
+            bit = 1 << index
+            if self.mask & bit:
+                return -1
+
+            # if this card is in the deck, add it to the hand
+            if (use_deck is not None) and (use_deck.take_card(Card(index)) == -1):
+                continue
+
+            self.mask |= bit
+            self.suit_ranks |= 1 << (((index & 3) * SUIT_SHIFT) + (index >> 2))
+
+    def merge(self, other_hand):
+        """ add the cards from another compact hand to this one.  cards already held are skipped
+        and -1 is returned if there were any """
+        overlap = self.mask & other_hand.mask
+        self.mask |= other_hand.mask
+        self.suit_ranks |= other_hand.suit_ranks
+        if overlap:
+            return -1
+
+    def card_indices(self):
+        """ return the canonical indices of the held cards, lowest first """
+        out = []
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            out.append(low.bit_length() - 1)
+            mask ^= low
+        return out
+
+    def suit_masks(self):
+        """ return the (clubs, diamonds, hearts, spades) rank masks """
+        packed = self.suit_ranks
+        return (packed & RANK_BITS, (packed >> 16) & RANK_BITS,
+                (packed >> 32) & RANK_BITS, (packed >> 48) & RANK_BITS)
+
+    def get_hand_value(self):
+        """ get the handvalue object that describes the conventional poker ranking of this hand """
+        return Evaluator.hand_value(*self.suit_masks())
+
+    def get_canonical(self):
+        """ get the canonical value of this hand without building a HandValue """
+        return Evaluator.canonical(*self.suit_masks())
+
+    def __len__(self):
+        return bin(self.mask).count('1')
+
+    def __eq__(self, other):
+        return isinstance(other, CompactHand) and (self.mask == other.mask)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.mask)
+
+# 64 bit masks, 'q' isn't available everywhere
+try:
+    MASK_TYPECODE = 'q'
+    array.array(MASK_TYPECODE)
+except ValueError:
+    MASK_TYPECODE = 'l'
+
+try:
+    long_type = long
+except NameError:
+    long_type = int
+
+class HandArray(object):
+    """ many hands stored as card masks in one array, eight bytes per hand.  indexing returns
+    a CompactHand for that entry """
+
+    def __init__(self, hands=()):
+        self.masks = array.array(MASK_TYPECODE)
+        for hand in hands:
+            self.append(hand)
+
+    def append(self, hand):
+        """ add a CompactHand, a Hand, or a raw card mask """
+        if isinstance(hand, (int, long_type)):
+            self.masks.append(hand)
+        else:
+            self.masks.append(hand.mask)
+
+    def __len__(self):
+        return len(self.masks)
+
+    def __getitem__(self, i):
+        return CompactHand(self.masks[i])
+
+    def canonicals(self):
+        """ return an array with the canonical value of every hand """
+        evaluate = Evaluator.evaluate_mask
+        return array.array('i', [evaluate(mask) for mask in self.masks])
@@ -0,0 +1,204 @@
+import itertools
+from deck.combos import Binomial
+from deck.deck import DECK_SIZE, card_indices
+from eval.handvalue import HandValue
+from eval.pokerhand import PP_straights
+
+# hold/discard analysis for five card draw.  for each of the 32 ways to hold some of the
+# dealt cards, the replacement cards are counted by rank instead of being dealt out: a
+# multiset of drawn ranks can be completed in prod C(available of rank, drawn of rank) ways,
+# and the five final ranks fix the hand's category.  suits only matter for flushes, which need
+# distinct ranks and every card in one suit, so those ways are counted separately and taken
+# out of the straight / high card total.  counts for a hold only depend on the held and
+# discarded cards up to a relabelling of suits, so they are cached on that shape.
+
+HAND_SIZE = 5
+RANKS = 13
+
+RankMultisets = {}
+FiveRankCategories = {}
+
+def rank_multisets(m):
+    """ return every multiset of m ranks a deck can supply, as (ranks, ((rank, count), ...)) """
+    found = RankMultisets.get(m)
+    if found is None:
+        found = []
+        for ranks in itertools.combinations_with_replacement(range(RANKS), m):
+            counted = tuple((r, ranks.count(r)) for r in sorted(set(ranks)))
+            if all(count <= 4 for r, count in counted):
+                found.append((ranks, counted))
+        RankMultisets[m] = found
+    return found
+
+def five_rank_category(ranks):
+    """ return (type, top pair rank or -1) for five sorted ranks, ignoring suits """
+    found = FiveRankCategories.get(ranks)
+    if found is not None:
+        return found
+
+    counts = sorted((ranks.count(r), r) for r in set(ranks))
+    counts.reverse()
+    pattern = [count for count, r in counts]
+    top = counts[0][1]
+
+    if pattern == [4, 1]:
+        found = (HandValue.HV_QUADS, -1)
+    elif pattern == [3, 2]:
+        found = (HandValue.HV_FULL_HOUSE, -1)
+    elif pattern == [3, 1, 1]:
+        found = (HandValue.HV_TRIPS, -1)
+    elif pattern == [2, 2, 1]:
+        found = (HandValue.HV_TWO_PAIR, -1)
+    elif pattern == [2, 1, 1, 1]:
+        found = (HandValue.HV_PAIR, top)
+    else:
+        mask = 0
+        for r in ranks:
+            mask |= 1 << r
+        if mask in PP_straights:
+            found = (HandValue.HV_STRAIGHT, -1)
+        else:
+            found = (HandValue.HV_HIGH_CARD, -1)
+
+    FiveRankCategories[ranks] = found
+    return found
+
+def hold_counts(held, discarded, dead=()):
+    """ count the final hands reachable by holding the cards in held and drawing to five from
+    every card not held, discarded or dead.  returns (counts, pairs): counts is indexed by
+    HV_ type, pairs counts the one pair hands by the value of the pair """
+    gone = 0
+    for card in itertools.chain(held, discarded, dead):
+        gone |= 1 << card
+
+    avail = [0] * RANKS
+    suit_avail = [0, 0, 0, 0]
+    for card in range(DECK_SIZE):
+        if not (gone & (1 << card)):
+            avail[card >> 2] += 1
+            suit_avail[card & 3] |= 1 << (card >> 2)
+
+    held_ranks = tuple(card >> 2 for card in held)
+    held_suits = set(card & 3 for card in held)
+    if not held:
+        flush_suits = [0, 1, 2, 3]
+    elif len(held_suits) == 1:
+        flush_suits = list(held_suits)
+    else:
+        flush_suits = []
+
+    counts = [0] * (HandValue.HV_STR_FLUSH + 1)
+    pairs = [0] * RANKS
+    for ranks, counted in rank_multisets(HAND_SIZE - len(held)):
+        ways = 1
+        for r, count in counted:
+            ways *= Binomial[count][avail[r]]
+            if not ways:
+                break
+        if not ways:
+            continue
+
+        hand_type, pair_rank = five_rank_category(tuple(sorted(held_ranks + ranks)))
+
+        # distinct ranks: some of these ways may be flushes
+        if flush_suits and ((hand_type == HandValue.HV_STRAIGHT) or
+                            (hand_type == HandValue.HV_HIGH_CARD)):
+            flush_ways = 0
+            for suit in flush_suits:
+                in_suit = suit_avail[suit]
+                for r in ranks:
+                    if not (in_suit & (1 << r)):
+                        break
+                else:
+                    flush_ways += 1
+            if flush_ways:
+                if hand_type == HandValue.HV_STRAIGHT:
+                    counts[HandValue.HV_STR_FLUSH] += flush_ways
+                else:
+                    counts[HandValue.HV_FLUSH] += flush_ways
+                ways -= flush_ways
+
+        counts[hand_type] += ways
+        if hand_type == HandValue.HV_PAIR:
+            pairs[pair_rank] += ways
+
+    return counts, pairs
+
+def hold_shape(held, discarded):
+    """ a key that is the same for any two holds that differ only by a relabelling of suits """
+    shape = []
+    for suit in range(4):
+        held_mask = 0
+        discarded_mask = 0
+        for card in held:
+            if (card & 3) == suit:
+                held_mask |= 1 << (card >> 2)
+        for card in discarded:
+            if (card & 3) == suit:
+                discarded_mask |= 1 << (card >> 2)
+        shape.append((held_mask, discarded_mask))
+    shape.sort()
+    return tuple(shape)
+
+HoldCache = {}
+HOLD_CACHE_LIMIT = 200000
+
+def cached_hold_counts(held, discarded):
+    """ hold_counts for a hold with no other dead cards, cached on the hold's shape """
+    key = hold_shape(held, discarded)
+    found = HoldCache.get(key)
+    if found is None:
+        if len(HoldCache) >= HOLD_CACHE_LIMIT:
+            HoldCache.clear()
+        found = hold_counts(held, discarded)
+        HoldCache[key] = found
+    return found
+
+class HoldResult:
+    """ the outcome of one hold: the held cards, the expected payout, and how many of the
+    total equally likely draws end up paid as each HV_ type """
+
+    def __init__(self, held, ev, counts, total):
+        self.held = held
+        self.ev = ev
+        self.counts = counts
+        self.total = total
+
+def analyze_hand(cards, paytable, min_pair=None, dead=()):
+    """ return a HoldResult for each of the 32 holds of a five card hand.  result i holds the
+    cards whose positions are set in the bits of i.  paytable maps HV_ types to payouts; with
+    min_pair set, pairs below that card value pay (and are counted) as high card """
+    cards = card_indices(cards)
+    dead = card_indices(dead)
+    if len(cards) != HAND_SIZE or len(set(cards + dead)) != len(cards) + len(dead):
+        raise ValueError("need five distinct cards, none of them dead")
+
+    results = []
+    for hold in range(1 << HAND_SIZE):
+        held = [card for i, card in enumerate(cards) if hold & (1 << i)]
+        discarded = [card for i, card in enumerate(cards) if not (hold & (1 << i))]
+        if dead:
+            counts, pairs = hold_counts(held, discarded, dead)
+        else:
+            counts, pairs = cached_hold_counts(held, discarded)
+
+        counts = list(counts)
+        if min_pair is not None:
+            low = sum(pairs[:min_pair])
+            counts[HandValue.HV_PAIR] -= low
+            counts[HandValue.HV_HIGH_CARD] += low
+
+        total = sum(counts)
+        payout = sum(paytable.get(t, 0) * count for t, count in enumerate(counts))
+        results.append(HoldResult(held, float(payout) / total, counts, total))
+
+    return results
+
+def best_hold(cards, paytable, min_pair=None, dead=()):
+    """ return the HoldResult with the highest expected payout """
+    return max(analyze_hand(cards, paytable, min_pair, dead), key=lambda result: result.ev)
+
+def analyze_hands(hands, paytable, min_pair=None):
+    """ analyze_hand for many dealt hands.  holds that share a shape with one seen earlier in
+    the batch reuse its counts """
+    return [analyze_hand(cards, paytable, min_pair) for cards in hands]
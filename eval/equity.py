@@ -0,0 +1,158 @@
+import itertools
+import math
+import random
+from deck.deck import BOARD_SIZE, DECK_SIZE, card_indices
+from eval.handvalue import canonical_value
+from eval.maskeval import Evaluator, suit_masks
+
+# hold'em style equity: each player has hole cards, everyone shares the board, and the board
+# is completed from the cards nobody holds.  small runout counts are enumerated outright;
+# otherwise runouts are sampled until every player's equity is known to within a tolerance.
+#
+# sampling uses two variance reduction tricks.  every player is scored on the same runout
+# (common random numbers), and runouts are stratified on their first card: each sweep
+# visits every possible first card once in random order and fills in the rest of the board
+# at random.  sweeps are independent, so the spread of the per-sweep means gives the
+# confidence interval used for the stopping rule.
+
+def normal_quantile(confidence):
+    """ the two sided z value for a confidence level, e.g. 1.96 for 0.95 """
+    target = 1.0 - (1.0 - confidence) / 2.0
+    lo = 0.0
+    hi = 10.0
+    for i in range(100):
+        mid = (lo + hi) / 2.0
+        if 0.5 * (1.0 + math.erf(mid / math.sqrt(2.0))) < target:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2.0
+
+def sweep_errors(sums, squares, sweeps, z):
+    """ confidence interval half widths from the sums and sums of squares of each player's
+    per-sweep means, over two or more independent sweeps """
+    errors = []
+    for total, square in zip(sums, squares):
+        mean = total / sweeps
+        variance = max(square / sweeps - mean * mean, 0.0) * sweeps / (sweeps - 1)
+        errors.append(z * math.sqrt(variance / sweeps))
+    return errors
+
+class EquityResult:
+    """ per-player equities (a split pot counts as a share), the half width of each player's
+    confidence interval (0 when enumerated exactly, None when sampling stopped after a single
+    sweep so no interval could be estimated) and the number of runouts used """
+
+    def __init__(self, equities, errors, trials, exact):
+        self.equities = equities
+        self.errors = errors
+        self.trials = trials
+        self.exact = exact
+
+    def max_error(self):
+        if self.errors is None:
+            return None
+        return max(self.errors) if self.errors else 0.0
+
+class EquitySpot:
+    """ the fixed part of an equity problem: each player's hole cards plus the known board as
+    suit masks, and the stub of cards left to complete the board from """
+
+    def __init__(self, hole_cards, board=(), dead=()):
+        self.holes = [card_indices(cards) for cards in hole_cards]
+        self.board = card_indices(board)
+        dead = card_indices(dead)
+
+        used = 0
+        for card in list(itertools.chain(self.board, dead, *self.holes)):
+            if (card < 0) or (card >= DECK_SIZE) or (used & (1 << card)):
+                raise ValueError("bad or repeated card index {0}".format(card))
+            used |= 1 << card
+        if len(self.board) > BOARD_SIZE:
+            raise ValueError("a board has at most {0} cards".format(BOARD_SIZE))
+
+        self.base = [suit_masks(hole + self.board) for hole in self.holes]
+        self.stub = [card for card in range(DECK_SIZE) if not (used & (1 << card))]
+        self.need = BOARD_SIZE - len(self.board)
+
+    def shares(self, runout):
+        """ return each player's share of the pot for one runout """
+        values = []
+        for c, d, h, s in self.base:
+            masks = [c, d, h, s]
+            for card in runout:
+                masks[card & 3] |= 1 << (card >> 2)
+            values.append(canonical_value(*Evaluator.hand_fields(*masks)))
+
+        best = max(values)
+        winners = values.count(best)
+        return [(1.0 / winners) if value == best else 0.0 for value in values]
+
+def exact_equity(spot):
+    """ enumerate every runout of an EquitySpot """
+    totals = [0.0] * len(spot.holes)
+    trials = 0
+    for runout in itertools.combinations(spot.stub, spot.need):
+        for player, share in enumerate(spot.shares(runout)):
+            totals[player] += share
+        trials += 1
+
+    return EquityResult([total / trials for total in totals], [0.0] * len(totals), trials, True)
+
+def adaptive_equity(hole_cards, board=(), dead=(), tolerance=0.005, confidence=0.95,
+                    min_sweeps=8, max_trials=2000000, exhaustive_limit=5000, rng=None):
+    """ estimate each player's equity to within tolerance at the given confidence.  spots
+    with at most exhaustive_limit runouts are enumerated exactly.  sampling stops after
+    max_trials runouts even if the tolerance hasn't been reached, though it always finishes
+    one sweep """
+    if max_trials < 1:
+        raise ValueError("max_trials must be at least 1")
+    spot = EquitySpot(hole_cards, board, dead)
+    players = len(spot.holes)
+
+    runouts = 1
+    for i in range(spot.need):
+        runouts = runouts * (len(spot.stub) - i) // (i + 1)
+    # a complete board has a single runout, there is nothing to sample
+    if (runouts <= exhaustive_limit) or (spot.need == 0):
+        return exact_equity(spot)
+
+    if rng is None:
+        rng = random.Random()
+    z = normal_quantile(confidence)
+
+    # for each possible first card, the cards the rest of the runout is drawn from
+    first_cards = list(spot.stub)
+    rest = dict((card, [x for x in spot.stub if x != card]) for card in first_cards)
+    extra = spot.need - 1
+    sample = rng.sample
+
+    sums = [0.0] * players
+    squares = [0.0] * players
+    sweeps = 0
+    trials = 0
+    errors = None
+
+    while trials < max_trials:
+        rng.shuffle(first_cards)
+        totals = [0.0] * players
+        for card in first_cards:
+            runout = [card] + sample(rest[card], extra)
+            for player, share in enumerate(spot.shares(runout)):
+                totals[player] += share
+        trials += len(first_cards)
+        sweeps += 1
+
+        for player in range(players):
+            mean = totals[player] / len(first_cards)
+            sums[player] += mean
+            squares[player] += mean * mean
+
+        if sweeps < 2:
+            continue
+
+        errors = sweep_errors(sums, squares, sweeps, z)
+        if (sweeps >= min_sweeps) and (max(errors) < tolerance):
+            break
+
+    return EquityResult([total / sweeps for total in sums], errors, trials, False)
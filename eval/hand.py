@@ -1,5 +1,5 @@
 import array
-from deck.deck import Card
+from deck.deck import Card, DBShortNameIndex, DBSingleNames
 
 class Hand:
     def __init__(self):
@@ -9,6 +9,7 @@ class Hand:
         self.values = array.array('i', [0]*13)
         self.vals_in_suit = array.array('i', [0]*4)
         self.all_values = 0
+        self.mask = 0
 
     def add_cards(self, new_cards, use_deck):
         """ add a set of cards to a hand, taking the cards from the given deck,  each card in 
@@ -18,12 +19,8 @@ class Hand:
 
         #if we get a string, make it into a set of cards
         if (isinstance(new_cards, str)):
-            to_add = []
-            card_str = new_cards
-            while len(card_str) > 1:
-                to_add.append(card_str[:2])
-                card_str = card_str[2:]
-            
+            to_add = [new_cards[i:i + 2] for i in range(0, len(new_cards) - 1, 2)]
+
         for x in to_add:
             if (isinstance(x, Card) and (x.is_valid())):
                 new_card = x
@@ -33,17 +30,19 @@ class Hand:
                 else:
                     return -1
             elif isinstance(x, str):
-                new_card = Card(x)
-                if new_card == -1:
+                if x in DBShortNameIndex:
+                    new_card = Card(DBShortNameIndex[x])
+                elif (len(x) == 1) and (x in DBSingleNames):
+                    new_card = Card(x)
+                else:
                     return -1
             else:
                 return -1
 
             # check to see if this new card is already in the hand
-            new_index = new_card.get_index()
-            for test_card in self.cards:
-                if (test_card.get_index() == new_index):
-                    return -1
+            new_bit = 1 << new_card.get_index()
+            if self.mask & new_bit:
+                return -1
 
             # if this card is in the deck, add it to the hand
             if (use_deck == None) or (use_deck.take_card(new_card) != -1):
@@ -52,6 +51,7 @@ class Hand:
                 self.values[new_card.value] += 1
                 self.vals_in_suit[new_card.suit] |= 1 << new_card.value
                 self.all_values |= 1 << new_card.value
+                self.mask |= new_bit
 
     def merge(self, other_hand):
         """ add the cards from another hand to this one """
@@ -19,7 +19,7 @@ class HandValue:
              type = an integer that represents the class of the hand (by the HV_ vals above)
              primary = the suit or value of the card that represents the value in the class
              secondary = the second value that represents the value of the hand
-             tertiary = a bitmap of the values in the hand """
+             tertiary = a bitmap of the kickers that play (at most five values in all) """
 
     def __init__(self, new_type, new_primary, new_secondary, new_tertiary):
         self.type = new_type
@@ -30,18 +30,7 @@ class HandValue:
 
     def get_canonical(self):
         """ return an integer that represents the value of a hand.  For all hands, if the canonical value is larger, then hand wins """
-        
-        # construct a 32 bit value, with the top three bits encoded as the hand type minus one
-        # the primary is always in the range 0-12, so we reserve four bits for it
-        # same with the secondary
-        # the tertiary is a bitmap, needs at most 13 bits....these are the new LSB
-
-        new_val = (self.type - 1) << 22
-        new_val |= self.primary << 18
-        new_val |= self.secondary << 14
-        new_val |= self.tertiary
-
-        return new_val
+        return canonical_value(self.type, self.primary, self.secondary, self.tertiary)
 
     def long_name(self):
         """ Print a string representation of the hand value """
@@ -55,3 +44,18 @@ class HandValue:
         else:
             return HandNameTemplates[self.type].format(deck.DBLongCardNames[self.primary])
 
+def canonical_value(hand_type, primary, secondary, tertiary):
+    """ build the canonical value from the four HandValue fields, without needing the object """
+
+    # construct a 32 bit value, with the top three bits encoded as the hand type minus one
+    # the primary is always in the range 0-12, so we reserve four bits for it
+    # same with the secondary
+    # the tertiary is a bitmap, needs at most 13 bits....these are the new LSB
+
+    # flushes carry their value bitmap in the secondary and the suit in the tertiary.
+    # shifting the bitmap up would run into the type bits, so it goes in the LSB instead
+    # and the suit (which never breaks a tie) is dropped
+    if (hand_type == HandValue.HV_FLUSH):
+        return ((hand_type - 1) << 22) | (primary << 18) | secondary
+
+    return ((hand_type - 1) << 22) | (primary << 18) | (secondary << 14) | tertiary
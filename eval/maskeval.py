@@ -0,0 +1,272 @@
+import array
+import os
+import struct
+import sys
+import warnings
+import zlib
+from deck.deck import Card
+from eval.handvalue import HandValue, canonical_value
+from eval.pokerhand import PP_straights
+
+# table driven evaluation of hands stored as per-suit rank masks.  each mask is a 13 bit
+# vector with 1 = 2, 10 = 3, ... 1<<12 = Ace, like PokerHand.vals_in_suit.  every question
+# PokerHand answers with a scan over its count arrays becomes a lookup indexed by a mask,
+# and the results match PokerHand.get_hand_value field for field
+
+RANK_MASKS = 1 << 13
+
+# the tables live back to back in one flat array so they can be saved or shared as a block
+TABLE_NAMES = ('popcount', 'high_bit', 'top5', 'straight_top')
+TABLE_TYPECODE = 'h'
+TABLE_SIZE = len(TABLE_NAMES) * RANK_MASKS
+
+# building the tables takes longer than importing everything else, so the shared evaluator
+# doesn't build them until the first hand is evaluated.  a prebuilt table file (written by
+# save_tables, or python -m eval.maskeval) is loaded instead when PYPOKER_TABLES names one or
+# there is one at DEFAULT_TABLE_PATH.  the file is a header followed by the flat table block
+# in native byte order:
+#      header = magic, layout version, table entry count, cache slot count (always 0 here),
+#               table build version, crc32 of the table block
+# TABLE_BUILD_VERSION has to be bumped whenever build_tables, or the values a shared block
+# caches, would come out differently.  a file left over from an older build is then refused
+# (with a warning) and the tables are rebuilt instead
+TABLE_MAGIC = b'PPTB'
+TABLE_LAYOUT_VERSION = 2
+TABLE_BUILD_VERSION = 1
+TABLE_HEADER = struct.Struct('=4sIIIII')
+TABLE_ENV = 'PYPOKER_TABLES'
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'maskeval_tables.bin')
+
+def build_tables():
+    """ build the flat lookup table array.  for every rank mask m:
+             popcount[m] = number of values in m
+             high_bit[m] = highest value in m, -1 for the empty mask
+             top5[m] = m with all but the highest five values cleared
+             straight_top[m] = top value of the best straight in m, -1 if there is none """
+    popcount = [0] * RANK_MASKS
+    high_bit = [-1] * RANK_MASKS
+    for m in range(1, RANK_MASKS):
+        popcount[m] = popcount[m >> 1] + (m & 1)
+        high_bit[m] = high_bit[m >> 1] + 1
+
+    top5 = [0] * RANK_MASKS
+    straight_top = [-1] * RANK_MASKS
+    for m in range(RANK_MASKS):
+        rest = m
+        while popcount[rest] > 5:
+            rest &= rest - 1
+        top5[m] = rest
+
+        # PP_straights is in value order, so the last match is the best straight
+        for top, straight_mask in enumerate(PP_straights):
+            if (m & straight_mask) == straight_mask:
+                straight_top[m] = top + Card.CV_FIVE
+
+    return array.array(TABLE_TYPECODE, popcount + high_bit + top5 + straight_top)
+
+def table_checksum(flat):
+    """ the crc32 of a flat table block """
+    return zlib.crc32(flat) & 0xffffffff
+
+def check_table_header(magic, version, table_size, build_version, checksum, flat):
+    """ raise ValueError unless a table header matches this build and the table block """
+    if (magic != TABLE_MAGIC) or (version != TABLE_LAYOUT_VERSION) or (table_size != TABLE_SIZE):
+        raise ValueError("not a table file, or one built by another version")
+    if build_version != TABLE_BUILD_VERSION:
+        raise ValueError("tables were built by build version {0}, this is {1}".format(
+                build_version, TABLE_BUILD_VERSION))
+    if checksum != table_checksum(flat):
+        raise ValueError("table checksum doesn't match, the file is corrupt")
+
+def save_tables(path, flat=None):
+    """ write a table file that load_tables can read back """
+    if flat is None:
+        flat = build_tables()
+    partial = path + '.tmp'
+    with open(partial, 'wb') as f:
+        f.write(TABLE_HEADER.pack(TABLE_MAGIC, TABLE_LAYOUT_VERSION, TABLE_SIZE, 0,
+                                  TABLE_BUILD_VERSION, table_checksum(flat)))
+        flat.tofile(f)
+    os.rename(partial, path)
+
+def load_tables(path):
+    """ read a table file written by save_tables.  raises ValueError if the file wasn't
+    written by this version of the code or is corrupt, or IOError if it can't be read """
+    flat = array.array(TABLE_TYPECODE)
+    with open(path, 'rb') as f:
+        header = f.read(TABLE_HEADER.size)
+        if len(header) != TABLE_HEADER.size:
+            raise ValueError("{0} is not a table file".format(path))
+        magic, version, table_size, cache_slots, build_version, checksum = TABLE_HEADER.unpack(header)
+        if cache_slots != 0:
+            raise ValueError("{0} is a shared table block, not a table file".format(path))
+        try:
+            flat.fromfile(f, TABLE_SIZE)
+        except EOFError:
+            raise ValueError("{0} is truncated".format(path))
+    try:
+        check_table_header(magic, version, table_size, build_version, checksum, flat)
+    except ValueError as e:
+        raise ValueError("{0}: {1}".format(path, e))
+    return flat
+
+def default_tables():
+    """ the tables for the shared evaluator: from the prebuilt file if there is a usable one,
+    built from scratch otherwise.  a table file that is named by PYPOKER_TABLES, or sits at
+    the default path, but can't be used gets a RuntimeWarning """
+    path = os.environ.get(TABLE_ENV)
+    if not path and os.path.exists(DEFAULT_TABLE_PATH):
+        path = DEFAULT_TABLE_PATH
+    if path:
+        try:
+            return load_tables(path)
+        except (IOError, OSError, ValueError) as e:
+            warnings.warn("can't use table file ({0}), building the tables instead; "
+                          "python -m eval.maskeval rewrites it".format(e), RuntimeWarning)
+    return build_tables()
+
+def split_tables(flat):
+    """ return the individual tables from a flat table block (an array or a memoryview) """
+    return [flat[i * RANK_MASKS:(i + 1) * RANK_MASKS] for i in range(len(TABLE_NAMES))]
+
+def suit_masks(cards):
+    """ return the four per-suit rank masks (clubs, diamonds, hearts, spades) for a
+    sequence of canonical card indices """
+    masks = [0, 0, 0, 0]
+    for index in cards:
+        masks[index & 3] |= 1 << (index >> 2)
+    return masks
+
+def card_mask_to_suit_masks(mask):
+    """ return the four per-suit rank masks for a 52 bit card mask """
+    masks = [0, 0, 0, 0]
+    while mask:
+        low = mask & -mask
+        index = low.bit_length() - 1
+        masks[index & 3] |= 1 << (index >> 2)
+        mask ^= low
+    return masks
+
+def top_values(popcount, m, n):
+    """ m with all but the highest n values cleared """
+    while popcount[m] > n:
+        m &= m - 1
+    return m
+
+class MaskEvaluator:
+    """ evaluates per-suit rank masks with a set of lookup tables.  the tables can come from
+    build_tables or from any buffer holding the same flat layout.  with no tables given they
+    are fetched by default_tables the first time they're needed """
+
+    def __init__(self, flat=None):
+        if flat is not None:
+            self.set_tables(flat)
+
+    def set_tables(self, flat):
+        self.flat = flat
+        self.split = split_tables(flat)
+        self.popcount, self.high_bit, self.top5, self.straight_top = self.split
+
+    def clear_tables(self):
+        """ drop the tables, the next evaluation fetches them again with default_tables """
+        for name in ('flat', 'split') + TABLE_NAMES:
+            self.__dict__.pop(name, None)
+
+    def __getattr__(self, name):
+        # only called for missing attributes, so once the tables are set this costs nothing
+        if name in ('flat', 'split') + TABLE_NAMES:
+            self.set_tables(default_tables())
+            return getattr(self, name)
+        raise AttributeError(name)
+
+    def hand_fields(self, c, d, h, s):
+        """ return the (type, primary, secondary, tertiary) HandValue fields for the hand with
+        the given clubs, diamonds, hearts and spades rank masks """
+        popcount = self.popcount
+        high_bit = self.high_bit
+        straight_top = self.straight_top
+
+        all_values = c | d | h | s
+
+        # suits are checked spades first, the same order PokerHand uses
+        flush_suit = -1
+        flush_mask = 0
+        for suit, m in ((3, s), (2, h), (1, d), (0, c)):
+            if popcount[m] > 4:
+                top = straight_top[m]
+                if top >= 0:
+                    return (HandValue.HV_STR_FLUSH, top, suit, 0)
+                if flush_suit < 0:
+                    flush_suit = suit
+                    flush_mask = m
+
+        # the tertiary only holds the kickers that play, so cards outside the best five
+        # never break a tie
+        quads = c & d & h & s
+        if quads:
+            quad_val = high_bit[quads]
+            return (HandValue.HV_QUADS, quad_val, 0,
+                    top_values(popcount, all_values & ~(1 << quad_val), 1))
+
+        # values held in at least three suits, and in at least two
+        trips = (c & d & (h | s)) | (h & s & (c | d))
+        pairs = (c & (d | h | s)) | (d & (h | s)) | (h & s)
+
+        if trips:
+            trip_val = high_bit[trips]
+            rest = pairs & ~(1 << trip_val)
+            if rest:
+                return (HandValue.HV_FULL_HOUSE, trip_val, high_bit[rest], 0)
+
+        if flush_suit >= 0:
+            result = self.top5[flush_mask]
+            return (HandValue.HV_FLUSH, high_bit[result], result, flush_suit)
+
+        top = straight_top[all_values]
+        if top >= 0:
+            return (HandValue.HV_STRAIGHT, top, 0, 0)
+
+        if trips:
+            trip_val = high_bit[trips]
+            return (HandValue.HV_TRIPS, trip_val, 0,
+                    top_values(popcount, all_values & ~(1 << trip_val), 2))
+
+        if pairs:
+            first = high_bit[pairs]
+            rest = pairs & ~(1 << first)
+            if rest:
+                second = high_bit[rest]
+                kickers = all_values & ~(1 << first) & ~(1 << second)
+                return (HandValue.HV_TWO_PAIR, first, second, top_values(popcount, kickers, 1))
+            return (HandValue.HV_PAIR, first, 0, top_values(popcount, all_values & ~(1 << first), 3))
+
+        return (HandValue.HV_HIGH_CARD, 0, 0, self.top5[all_values])
+
+    def hand_type(self, c, d, h, s):
+        """ return just the HV_ type of the hand """
+        return self.hand_fields(c, d, h, s)[0]
+
+    def canonical(self, c, d, h, s):
+        """ return the canonical value of the hand, as HandValue.get_canonical would """
+        return canonical_value(*self.hand_fields(c, d, h, s))
+
+    def hand_value(self, c, d, h, s):
+        """ return a HandValue object for the hand """
+        return HandValue(*self.hand_fields(c, d, h, s))
+
+    def evaluate_cards(self, cards):
+        """ return the canonical value for a sequence of canonical card indices """
+        return canonical_value(*self.hand_fields(*suit_masks(cards)))
+
+    def evaluate_mask(self, mask):
+        """ return the canonical value for a 52 bit card mask """
+        return canonical_value(*self.hand_fields(*card_mask_to_suit_masks(mask)))
+
+# the evaluator shared by the compact hands and batch evaluation, its tables arrive on first use
+Evaluator = MaskEvaluator()
+
+if __name__ == '__main__':
+    # prebuild the table file: python -m eval.maskeval [path]
+    target = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TABLE_PATH
+    save_tables(target)
+    print("wrote {0}".format(target))
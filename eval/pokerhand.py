@@ -1,7 +1,7 @@
 import array
 from deck.deck import Card
-import hand
-from handvalue import HandValue
+from eval import hand
+from eval.handvalue import HandValue
 
 # PP_straights contains a bit string representation of every possible straight, in value order
 # each bit represents a card, with 1 = 2, 10 = 3, etc, up to 1<<12 = Ace.  Lowest straight 
@@ -52,7 +52,9 @@ class PokerHand(hand.Hand):
         
         for cur_val, val_count in enumerate(reversed(self.values)):
             if (val_count > 3):
-                return HandValue(HandValue.HV_QUADS, fix(cur_val), 0, self.all_values)
+                # only the single best other card plays as the kicker
+                kicker = get_top_cards(self.all_values & ~(1 << fix(cur_val)), 1)
+                return HandValue(HandValue.HV_QUADS, fix(cur_val), 0, kicker)
 
         return False
 
@@ -109,10 +111,11 @@ class PokerHand(hand.Hand):
 
         for card, card_count in enumerate(reversed(self.values)):
             if (card_count > 2):
-                # found the set of three.  we make the secondary the value bit vector
-                # this will make sure that hands with the same set of three but different
-                # kickers and second kickers compare correctly
-                return HandValue(HandValue.HV_TRIPS, fix(card), 0, self.all_values)
+                # found the set of three.  we make the tertiary the bit vector of the two
+                # kickers that play, so hands with the same set of three but different
+                # kickers compare correctly, and cards that don't play can't break a tie
+                kickers = get_top_cards(self.all_values & ~(1 << fix(card)), 2)
+                return HandValue(HandValue.HV_TRIPS, fix(card), 0, kickers)
         
         return False
                 
@@ -126,12 +129,15 @@ class PokerHand(hand.Hand):
             if (card_count > 1):
                 pairs_found += 1
                 if (pairs_found == 2):
-                    return HandValue(HandValue.HV_TWO_PAIR, fix(last_pair), fix(card), self.all_values)
+                    rest = self.all_values & ~(1 << fix(last_pair)) & ~(1 << fix(card))
+                    return HandValue(HandValue.HV_TWO_PAIR, fix(last_pair), fix(card),
+                                     get_top_cards(rest, 1))
                 else:
                     last_pair = card
         
         if pairs_found:
-            return HandValue(HandValue.HV_PAIR, fix(last_pair), 0, self.all_values)
+            rest = self.all_values & ~(1 << fix(last_pair))
+            return HandValue(HandValue.HV_PAIR, fix(last_pair), 0, get_top_cards(rest, 3))
         
         return False
 
@@ -147,4 +153,4 @@ class PokerHand(hand.Hand):
                 return out
 
         # hand doesn't have any value other than high card
-        return HandValue(HandValue.HV_HIGH_CARD, 0, 0, self.all_values)
+        return HandValue(HandValue.HV_HIGH_CARD, 0, 0, get_top_cards(self.all_values, 5))
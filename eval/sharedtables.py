@@ -0,0 +1,242 @@
+import mmap
+import os
+import struct
+from eval import batch
+from eval.maskeval import MaskEvaluator, TABLE_SIZE, TABLE_TYPECODE, build_tables, Evaluator
+from eval.maskeval import TABLE_MAGIC, TABLE_LAYOUT_VERSION, TABLE_HEADER, check_table_header
+from eval.maskeval import TABLE_BUILD_VERSION, table_checksum
+
+# evaluation tables (and an optional cache of results keyed by card mask) in one block of
+# memory that a single process builds and any number of worker processes attach to read-only.
+# the block lives either in a multiprocessing.shared_memory segment or in an mmap'd file:
+#
+#      header = magic, layout version, table entry count, cache slot count, build version,
+#               crc32 of the tables
+#      tables = the flat maskeval table block, TABLE_SIZE signed 16 bit entries
+#      cache  = cache slot count pairs of signed 64 bit (card mask, canonical value), an
+#               all zero slot is empty
+#
+# everything is in native byte order, the block is only meant to be shared on one machine.
+# a block without a cache has the same layout as a maskeval table file, so a prebuilt table
+# file can be attached directly.  install() makes an attached block the source of the shared
+# Evaluator's tables, and of the result cache eval.batch checks, so a worker that installs
+# one never builds tables of its own
+
+TABLE_BYTES = TABLE_SIZE * struct.calcsize(TABLE_TYPECODE)
+CACHE_OFFSET = TABLE_HEADER.size + TABLE_BYTES
+SLOT_BYTES = 16
+MAX_PROBES = 8
+
+def segment_size(cache_slots):
+    """ the number of bytes a block with the given number of cache slots takes """
+    return CACHE_OFFSET + (cache_slots * SLOT_BYTES)
+
+def cache_slot(mask, cache_slots):
+    """ the first slot probed for a card mask """
+    return (((mask * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32) % cache_slots
+
+def fill_segment(buf, cache_slots, cache_masks):
+    """ write the header, the tables and the cached values for cache_masks into buf.  masks
+    that can't find a free slot within MAX_PROBES probes are left out """
+    flat = build_tables()
+    TABLE_HEADER.pack_into(buf, 0, TABLE_MAGIC, TABLE_LAYOUT_VERSION, TABLE_SIZE, cache_slots,
+                           TABLE_BUILD_VERSION, table_checksum(flat))
+    buf[TABLE_HEADER.size:CACHE_OFFSET] = flat.tobytes()
+    if not cache_slots:
+        return
+
+    view = memoryview(buf)[CACHE_OFFSET:segment_size(cache_slots)]
+    cache = view.cast('q')
+    for i in range(len(cache)):
+        cache[i] = 0
+
+    for mask in cache_masks:
+        if not mask:
+            continue
+        start = cache_slot(mask, cache_slots)
+        for probe in range(MAX_PROBES):
+            i = 2 * ((start + probe) % cache_slots)
+            if cache[i] in (0, mask):
+                cache[i + 1] = Evaluator.evaluate_mask(mask)
+                cache[i] = mask
+                break
+
+    cache.release()
+    view.release()
+
+# names of the segments created by this process
+CreatedSegments = set()
+
+def shared_memory_module():
+    """ import multiprocessing.shared_memory on first use, it isn't needed for file blocks """
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        raise RuntimeError("multiprocessing.shared_memory needs python 3.8, pass a path")
+    return shared_memory
+
+def attach_shared_memory(name):
+    """ attach to an existing segment without letting this process's resource tracker unlink
+    it at exit; the builder owns the segment """
+    shared_memory = shared_memory_module()
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+
+    segment = shared_memory.SharedMemory(name=name)
+    if segment.name in CreatedSegments:
+        # the tracker keeps one entry per name, and the builder's unlink will clear it
+        return segment
+    # the tracker was registered with the private _name, which on posix keeps the leading
+    # slash that .name strips, and unregister has to be given exactly the same string
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(segment._name, 'shared_memory')
+    except (ImportError, AttributeError):
+        pass
+    return segment
+
+class SharedTables:
+    """ evaluation tables and result cache read from a shared block.  use create() in the
+    process that builds the block and attach() (then install()) in the workers """
+
+    def __init__(self, buf, segment=None, mapped=None, owner=False):
+        self.segment = segment
+        self.mapped = mapped
+        self.owner = owner
+        self.installed = False
+
+        if len(buf) < TABLE_HEADER.size:
+            raise ValueError("table block is truncated")
+        magic, version, table_size, cache_slots, build_version, checksum = \
+            TABLE_HEADER.unpack_from(buf, 0)
+        if len(buf) < segment_size(cache_slots):
+            raise ValueError("table block is truncated")
+
+        base = memoryview(buf)
+        if not base.readonly:
+            base = base.toreadonly()
+        flat = base[TABLE_HEADER.size:CACHE_OFFSET].cast(TABLE_TYPECODE)
+        self.views = [base, flat]
+        try:
+            check_table_header(magic, version, table_size, build_version, checksum, flat)
+        except ValueError:
+            for view in reversed(self.views):
+                view.release()
+            raise
+
+        self.evaluator = MaskEvaluator(flat)
+        self.views.extend(self.evaluator.split)
+        self.cache_slots = cache_slots
+        self.cache = None
+        if cache_slots:
+            self.cache = base[CACHE_OFFSET:segment_size(cache_slots)].cast('q')
+            self.views.append(self.cache)
+
+    @classmethod
+    def create(cls, name=None, path=None, cache_masks=(), cache_slots=0):
+        """ build a block and return the owning SharedTables.  with a path the block is
+        written to that file, otherwise a shared memory segment is made (named name, or a
+        generated name available as .name) """
+        size = segment_size(cache_slots)
+
+        if path is not None:
+            block = bytearray(size)
+            fill_segment(block, cache_slots, cache_masks)
+            partial = path + '.tmp'
+            with open(partial, 'wb') as f:
+                f.write(block)
+            os.rename(partial, path)
+            return cls.attach(path=path, owner=True)
+
+        segment = shared_memory_module().SharedMemory(name=name, create=True, size=size)
+        CreatedSegments.add(segment.name)
+        fill_segment(segment.buf, cache_slots, cache_masks)
+        return cls(segment.buf, segment=segment, owner=True)
+
+    @classmethod
+    def attach(cls, name=None, path=None, owner=False):
+        """ attach read-only to a block built by create() """
+        if path is not None:
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                return cls(mapped, mapped=mapped, owner=owner)
+            except ValueError:
+                mapped.close()
+                raise
+
+        segment = attach_shared_memory(name)
+        return cls(segment.buf, segment=segment)
+
+    @property
+    def name(self):
+        return self.segment.name if self.segment is not None else None
+
+    def lookup(self, mask):
+        """ return the cached canonical value for a card mask, -1 on a miss """
+        if not self.cache_slots:
+            return -1
+        cache = self.cache
+        start = cache_slot(mask, self.cache_slots)
+        for probe in range(MAX_PROBES):
+            i = 2 * ((start + probe) % self.cache_slots)
+            found = cache[i]
+            if found == mask:
+                return cache[i + 1]
+            if found == 0:
+                return -1
+        return -1
+
+    def evaluate_mask(self, mask):
+        """ return the canonical value for a 52 bit card mask, from the cache if it's there """
+        value = self.lookup(mask) if mask else -1
+        if value < 0:
+            value = self.evaluator.evaluate_mask(mask)
+        return value
+
+    def evaluate_masks(self, masks):
+        """ return a list with the canonical value of each card mask """
+        return [self.evaluate_mask(mask) for mask in masks]
+
+    def install(self):
+        """ use this block's tables for the shared Evaluator, which eval.batch, the compact
+        hands, equity and the rest evaluate with, and have eval.batch check its result cache.
+        returns self """
+        Evaluator.set_tables(self.evaluator.flat)
+        self.views.extend(Evaluator.split)
+        batch.ResultCache = self
+        self.installed = True
+        return self
+
+    def close(self):
+        """ detach from the block, uninstalling it first if it was installed.  the process
+        that created a shared memory segment also removes it """
+        if self.installed:
+            # the views the Evaluator holds go with the rest, it refetches tables if needed
+            Evaluator.clear_tables()
+            if batch.ResultCache is self:
+                batch.ResultCache = None
+            self.installed = False
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        self.evaluator = None
+        self.cache = None
+
+        if self.mapped is not None:
+            self.mapped.close()
+            self.mapped = None
+        if self.segment is not None:
+            self.segment.close()
+            if self.owner:
+                self.segment.unlink()
+                CreatedSegments.discard(self.segment.name)
+            self.segment = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
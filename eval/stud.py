@@ -0,0 +1,306 @@
+import itertools
+import random
+from deck.combos import Binomial
+from deck.deck import Deck, DECK_SIZE, card_indices
+from eval.batch import evaluate_masks
+from eval.equity import EquityResult, normal_quantile, sweep_errors
+from eval.maskeval import Evaluator, suit_masks
+
+# seven card stud.  a table tracks, as 52 bit card masks, every card seen so far: each seat's
+# up cards, the down cards we know (our own), and the dead cards (folded hands and any other
+# exposed cards).  partial up card boards of one to four cards are ranked with the mask
+# evaluator, which can't make a straight or flush from fewer than five cards, so a board only
+# shows pairs, two pair, trips, quads or high cards, as the stud rules want.
+#
+# equity deals every live player's missing cards from the unseen stub and scores the best
+# five of seven.  small deals are enumerated one player at a time, larger ones are sampled in
+# sweeps until the confidence interval from the sweep means is narrow enough.  final hands
+# are card masks, evaluated a whole player level or sweep at a time through eval.batch (so
+# an installed shared result cache is used) and kept in a per-spot cache, since the same
+# final hand turns up under many deals of the other players' cards.
+
+STUD_HAND_SIZE = 7
+MAX_UP_CARDS = 4
+STUD_CACHE_LIMIT = 200000
+
+def upcard_value(cards):
+    """ the canonical value of a partial board of one to four up cards.  higher is better """
+    cards = card_indices(cards)
+    if not (0 < len(cards) <= MAX_UP_CARDS):
+        raise ValueError("an up card board has one to {0} cards".format(MAX_UP_CARDS))
+    return Evaluator.canonical(*suit_masks(cards))
+
+def bring_in_seat(door_cards):
+    """ the seat that brings it in: the lowest door card, ties on value going to the lowest
+    suit (clubs, diamonds, hearts, spades).  door_cards has one card index per seat, or None
+    for seats that aren't in the hand """
+    low = None
+    for seat, card in enumerate(door_cards):
+        if (card is not None) and ((low is None) or (card < door_cards[low])):
+            low = seat
+    return low
+
+def high_board_seat(boards):
+    """ the seat that acts first on fourth street and later: the best up card board, ties
+    going to the lowest seat.  boards has a list of up cards per seat, or None """
+    best = None
+    best_value = -1
+    for seat, cards in enumerate(boards):
+        if not cards:
+            continue
+        value = upcard_value(cards)
+        if value > best_value:
+            best = seat
+            best_value = value
+    return best
+
+def card_mask(cards):
+    """ the 52 bit mask of a sequence of canonical card indices """
+    mask = 0
+    for card in cards:
+        mask |= 1 << card
+    return mask
+
+class StudSpot:
+    """ the fixed part of a stud equity problem: the cards known in each live player's hand
+    as card masks, how many more each of them gets, and the stub they're dealt from.  final
+    hand values are cached on their card mask """
+
+    def __init__(self, known, dead=()):
+        self.known = [card_indices(cards) for cards in known]
+        dead = card_indices(dead)
+        if not self.known:
+            raise ValueError("an equity spot needs at least one player")
+
+        used = 0
+        for card in list(itertools.chain(dead, *self.known)):
+            if (card < 0) or (card >= DECK_SIZE) or (used & (1 << card)):
+                raise ValueError("bad or repeated card index {0}".format(card))
+            used |= 1 << card
+        for cards in self.known:
+            if len(cards) > STUD_HAND_SIZE:
+                raise ValueError("a stud hand has at most {0} cards".format(STUD_HAND_SIZE))
+
+        self.masks = [card_mask(cards) for cards in self.known]
+        self.values = {}
+        self.need = [STUD_HAND_SIZE - len(cards) for cards in self.known]
+        self.stub = [card for card in range(DECK_SIZE) if not (used & (1 << card))]
+        if sum(self.need) > len(self.stub):
+            raise ValueError("not enough unseen cards to complete every hand")
+
+    def deals(self):
+        """ the number of distinct ways to complete every hand """
+        count = 1
+        left = len(self.stub)
+        for need in self.need:
+            count *= Binomial[need][left]
+            left -= need
+        return count
+
+    def hand_values(self, masks):
+        """ the canonical values of a list of final hand masks.  the ones not in the cache
+        are evaluated in a single eval.batch call """
+        values = self.values
+        missing = [mask for mask in masks if mask not in values]
+        if missing:
+            if len(values) + len(missing) > STUD_CACHE_LIMIT:
+                values.clear()
+                missing = masks
+            for mask, value in zip(missing, evaluate_masks(missing)):
+                values[mask] = value
+        return [values[mask] for mask in masks]
+
+    def shares(self, values):
+        """ return each player's share of the pot given their final hand values """
+        best = max(values)
+        winners = values.count(best)
+        return [(1.0 / winners) if value == best else 0.0 for value in values]
+
+def exact_stud_equity(spot):
+    """ enumerate every completion of a StudSpot """
+    players = len(spot.known)
+    totals = [0.0] * players
+    values = [0] * players
+    trials = [0]
+
+    def deal(player, stub):
+        if player == players:
+            for i, share in enumerate(spot.shares(values)):
+                totals[i] += share
+            trials[0] += 1
+            return
+        completions = list(itertools.combinations(stub, spot.need[player]))
+        base = spot.masks[player]
+        finals = spot.hand_values([base | card_mask(drawn) for drawn in completions])
+        for drawn, value in zip(completions, finals):
+            values[player] = value
+            rest = [card for card in stub if card not in drawn] if drawn else stub
+            deal(player + 1, rest)
+
+    deal(0, spot.stub)
+    return EquityResult([total / trials[0] for total in totals], [0.0] * players, trials[0], True)
+
+def stud_equity(known, dead=(), tolerance=0.005, confidence=0.95, min_sweeps=8,
+                sweep_size=500, max_trials=1000000, exhaustive_limit=20000, rng=None):
+    """ estimate each live player's equity to within tolerance at the given confidence.
+    known has the cards known to be in each player's hand (all of ours, the up cards of
+    everyone else); dead has every other card seen.  spots with at most exhaustive_limit
+    deals are enumerated exactly, sampling stops after max_trials deals regardless (though
+    it always finishes one sweep) """
+    if max_trials < 1:
+        raise ValueError("max_trials must be at least 1")
+    if sweep_size < 1:
+        raise ValueError("sweep_size must be at least 1")
+    spot = StudSpot(known, dead)
+    players = len(spot.known)
+    if spot.deals() <= exhaustive_limit:
+        return exact_stud_equity(spot)
+
+    if rng is None:
+        rng = random.Random()
+    z = normal_quantile(confidence)
+
+    # where each player's cards start in a sampled deal
+    starts = [0]
+    for need in spot.need:
+        starts.append(starts[-1] + need)
+    total_need = starts[-1]
+    stub = spot.stub
+    sample = rng.sample
+
+    sums = [0.0] * players
+    squares = [0.0] * players
+    sweeps = 0
+    trials = 0
+    errors = None
+
+    while trials < max_trials:
+        totals = [0.0] * players
+        deals = [sample(stub, total_need) for i in range(sweep_size)]
+        finals = spot.hand_values([spot.masks[player] |
+                                   card_mask(drawn[starts[player]:starts[player + 1]])
+                                   for drawn in deals for player in range(players)])
+        for i in range(sweep_size):
+            for player, share in enumerate(spot.shares(finals[i * players:(i + 1) * players])):
+                totals[player] += share
+        trials += sweep_size
+        sweeps += 1
+
+        for player in range(players):
+            mean = totals[player] / sweep_size
+            sums[player] += mean
+            squares[player] += mean * mean
+
+        if sweeps < 2:
+            continue
+
+        errors = sweep_errors(sums, squares, sweeps, z)
+        if (sweeps >= min_sweeps) and (max(errors) < tolerance):
+            break
+
+    return EquityResult([total / sweeps for total in sums], errors, trials, False)
+
+class StudTable:
+    """ the cards seen at a stud table, seat by seat.  down cards dealt to other players are
+    recorded without a card, so the table knows how many cards each hand still needs """
+
+    def __init__(self, seats):
+        if seats < 1:
+            raise ValueError("a table needs at least one seat")
+        self.seats = seats
+        self.up = [[] for i in range(seats)]
+        self.down = [[] for i in range(seats)]
+        self.hidden = [0] * seats
+        self.folded = [False] * seats
+        self.up_mask = [0] * seats
+        self.seen = 0
+        self.dead = 0
+
+    def see(self, card):
+        """ mark a card as seen, returning its index """
+        indices = card_indices([card])
+        if len(indices) != 1:
+            raise ValueError("expected a single card, got {0!r}".format(card))
+        index = indices[0]
+        if (index < 0) or (index >= DECK_SIZE) or (self.seen & (1 << index)):
+            raise ValueError("bad or already seen card {0}".format(index))
+        self.seen |= 1 << index
+        return index
+
+    def check_seat(self, seat):
+        if not (0 <= seat < self.seats):
+            raise ValueError("no seat {0} at a {1} seat table".format(seat, self.seats))
+
+    def cards_dealt(self, seat):
+        self.check_seat(seat)
+        return len(self.up[seat]) + len(self.down[seat]) + self.hidden[seat]
+
+    def check_room(self, seat):
+        self.check_seat(seat)
+        if self.folded[seat]:
+            raise ValueError("seat {0} has folded".format(seat))
+        if self.cards_dealt(seat) >= STUD_HAND_SIZE:
+            raise ValueError("seat {0} already has {1} cards".format(seat, STUD_HAND_SIZE))
+
+    def deal_up(self, seat, card):
+        """ deal a face up card to a seat """
+        self.check_room(seat)
+        index = self.see(card)
+        self.up[seat].append(index)
+        self.up_mask[seat] |= 1 << index
+
+    def deal_down(self, seat, card=None):
+        """ deal a face down card to a seat, card is None when we don't get to see it """
+        self.check_room(seat)
+        if card is None:
+            self.hidden[seat] += 1
+        else:
+            self.down[seat].append(self.see(card))
+
+    def fold(self, seat):
+        """ a seat folds, every card of theirs we've seen is dead """
+        self.check_seat(seat)
+        self.folded[seat] = True
+        for index in self.up[seat] + self.down[seat]:
+            self.dead |= 1 << index
+
+    def kill(self, cards):
+        """ record cards seen outside any live hand (burn cards flashed, a mucked hand shown) """
+        for card in card_indices(cards):
+            self.dead |= 1 << self.see(card)
+
+    def live_seats(self):
+        return [seat for seat in range(self.seats) if not self.folded[seat]]
+
+    def visible_mask(self):
+        """ every up card in a live hand plus the dead cards """
+        mask = self.dead
+        for seat in self.live_seats():
+            mask |= self.up_mask[seat]
+        return mask
+
+    def unseen_deck(self):
+        """ a Deck holding only the cards not seen yet """
+        deck = Deck()
+        deck.take_cards([index for index in range(DECK_SIZE) if self.seen & (1 << index)])
+        return deck
+
+    def bring_in(self):
+        """ the seat that brings it in on third street """
+        doors = [self.up[seat][0] if (self.up[seat] and not self.folded[seat]) else None
+                 for seat in range(self.seats)]
+        return bring_in_seat(doors)
+
+    def high_board(self):
+        """ the live seat showing the best board, which acts first after third street """
+        return high_board_seat([self.up[seat][-MAX_UP_CARDS:] if not self.folded[seat] else None
+                                for seat in range(self.seats)])
+
+    def equity(self, **kwargs):
+        """ stud_equity for the live seats, returns (seats, EquityResult) """
+        seats = self.live_seats()
+        if not seats:
+            raise ValueError("every seat has folded, there is no equity to work out")
+        known = [self.up[seat] + self.down[seat] for seat in seats]
+        dead = [index for index in range(DECK_SIZE) if self.dead & (1 << index)]
+        return seats, stud_equity(known, dead, **kwargs)
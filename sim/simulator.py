@@ -0,0 +1,238 @@
+import asyncio
+import random
+import time
+from deck.deck import Deck
+from eval.batch import evaluate_hands
+
+# asyncio table simulator.  many tables share one BatchEvaluator, so showdowns from every
+# table that reaches the river at about the same time are resolved in a single call instead
+# of each table evaluating (and blocking the event loop) on its own
+
+FOLD = 0
+CALL = 1
+
+class Strategy:
+    """ base class for a simulated player.  act() is a coroutine so strategies can wait on
+    remote services or timers; the default strategy calls every hand down to showdown """
+
+    async def act(self, table, seat, hole_cards):
+        return CALL
+
+class RandomStrategy(Strategy):
+    """ folds with a fixed probability, optionally waiting think_time seconds before acting """
+
+    def __init__(self, fold_chance=0.5, think_time=0.0, rng=None):
+        self.fold_chance = fold_chance
+        self.think_time = think_time
+        self.rng = rng if rng is not None else random.Random()
+
+    async def act(self, table, seat, hole_cards):
+        if self.think_time:
+            await asyncio.sleep(self.think_time)
+        if self.rng.random() < self.fold_chance:
+            return FOLD
+        return CALL
+
+class BatchEvaluator:
+    """ collects showdowns from many tables and evaluates them together.  a batch is flushed
+    once it holds batch_size hands or max_delay seconds after its first showdown arrived.
+    if an executor is given the evaluation runs there, leaving the event loop free """
+
+    def __init__(self, batch_size=512, max_delay=0.001, executor=None):
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.executor = executor
+        self.pending = []
+        self.queued = 0
+        self.flush_handle = None
+        self.batches = 0
+        self.evaluated = 0
+
+    async def evaluate(self, hands):
+        """ return the canonical values for a list of hands, each a list of card indices """
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+        self.pending.append((hands, result))
+        self.queued += len(hands)
+
+        if self.queued >= self.batch_size:
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.max_delay, self.flush)
+
+        return await result
+
+    def flush(self):
+        """ evaluate everything queued so far """
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+
+        if not self.pending:
+            return
+
+        batch = self.pending
+        self.pending = []
+        self.queued = 0
+
+        all_hands = []
+        for hands, result in batch:
+            all_hands.extend(hands)
+
+        self.batches += 1
+        self.evaluated += len(all_hands)
+
+        if self.executor is None:
+            try:
+                self.deliver(batch, evaluate_hands(all_hands))
+            except Exception as exc:
+                self.fail(batch, exc)
+            return
+
+        loop = asyncio.get_running_loop()
+        job = loop.run_in_executor(self.executor, evaluate_hands, all_hands)
+
+        def done(job):
+            if job.cancelled():
+                self.fail(batch, asyncio.CancelledError())
+            elif job.exception() is not None:
+                self.fail(batch, job.exception())
+            else:
+                self.deliver(batch, job.result())
+
+        job.add_done_callback(done)
+
+    def deliver(self, batch, values):
+        """ hand each waiting table the slice of values that belongs to it """
+        start = 0
+        for hands, result in batch:
+            end = start + len(hands)
+            if not result.done():
+                result.set_result(values[start:end])
+            start = end
+
+    def fail(self, batch, exc):
+        for hands, result in batch:
+            if not result.done():
+                result.set_exception(exc)
+
+class Table:
+    """ a single simulated table: deals hole cards and a board from its own deck, asks each
+    seat's strategy whether it stays in, and resolves the showdown through the evaluator """
+
+    def __init__(self, strategies, evaluator, hole_count=2, board_count=5):
+        self.strategies = strategies
+        self.evaluator = evaluator
+        self.hole_count = hole_count
+        self.board_count = board_count
+        self.deck = Deck()
+        self.showdowns = 0
+
+    async def play_hand(self):
+        """ play one hand, return the list of winning seats (more than one on a split pot) """
+        self.deck.reset()
+        holes = [self.deck.deal_hand(self.hole_count) for s in self.strategies]
+        board = self.deck.deal_hand(self.board_count)
+
+        actions = await asyncio.gather(*[strategy.act(self, seat, holes[seat])
+                                         for seat, strategy in enumerate(self.strategies)])
+        live = [seat for seat, action in enumerate(actions) if action != FOLD]
+        if len(live) < 2:
+            return live
+
+        board_cards = [c.get_index() for c in board]
+        hands = [[c.get_index() for c in holes[seat]] + board_cards for seat in live]
+        values = await self.evaluator.evaluate(hands)
+        self.showdowns += 1
+
+        best = max(values)
+        return [seat for seat, value in zip(live, values) if value == best]
+
+class SimulationStats:
+    """ throughput and per-hand latency (in seconds) for a simulation run """
+
+    def __init__(self, hands, showdowns, batches, elapsed, latencies):
+        self.hands = hands
+        self.showdowns = showdowns
+        self.batches = batches
+        self.elapsed = elapsed
+        self.latencies = sorted(latencies)
+
+    def hands_per_sec(self):
+        if self.elapsed <= 0:
+            return 0.0
+        return self.hands / self.elapsed
+
+    def percentile(self, pct):
+        """ nearest-rank percentile of the hand latencies """
+        if not self.latencies:
+            return 0.0
+        # ceil(pct * n / 100) in integers (pct to a thousandth), float rounding would push
+        # some ranks up by one
+        n = len(self.latencies)
+        rank = -(-int(round(pct * 1000)) * n // 100000) - 1
+        return self.latencies[min(max(rank, 0), len(self.latencies) - 1)]
+
+    def report(self):
+        return ("{0} hands ({1} showdowns, {2} batches) in {3:.3f}s: {4:.0f} hands/sec, "
+                "latency p50 {5:.2f}ms p90 {6:.2f}ms p99 {7:.2f}ms").format(
+                    self.hands, self.showdowns, self.batches, self.elapsed, self.hands_per_sec(),
+                    self.percentile(50) * 1000, self.percentile(90) * 1000,
+                    self.percentile(99) * 1000)
+
+async def run_simulation(num_tables, hands_per_table, strategy_factory=Strategy, seats=6,
+                         batch_size=512, max_delay=0.001, executor=None):
+    """ play hands_per_table hands at each of num_tables concurrent tables.  strategy_factory
+    is called once per seat to build that seat's player """
+    evaluator = BatchEvaluator(batch_size, max_delay, executor)
+    tables = [Table([strategy_factory() for s in range(seats)], evaluator)
+              for t in range(num_tables)]
+    latencies = []
+
+    async def run_table(table):
+        for i in range(hands_per_table):
+            start = time.perf_counter()
+            await table.play_hand()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[run_table(table) for table in tables])
+    elapsed = time.perf_counter() - start
+
+    return SimulationStats(len(latencies), sum(t.showdowns for t in tables), evaluator.batches,
+                           elapsed, latencies)
+
+def simulate(num_tables, hands_per_table, **kwargs):
+    """ blocking wrapper around run_simulation """
+    return asyncio.run(run_simulation(num_tables, hands_per_table, **kwargs))
+
+def main(argv=None):
+    import argparse
+    from concurrent.futures import ProcessPoolExecutor
+
+    parser = argparse.ArgumentParser(description="simulate many concurrent poker tables")
+    parser.add_argument("--tables", type=int, default=1000)
+    parser.add_argument("--hands", type=int, default=10)
+    parser.add_argument("--seats", type=int, default=6)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--max-delay", type=float, default=0.001)
+    parser.add_argument("--fold-chance", type=float, default=0.5)
+    parser.add_argument("--processes", type=int, default=0,
+                        help="evaluate in a process pool of this size (0 = on the event loop)")
+    args = parser.parse_args(argv)
+
+    def factory():
+        return RandomStrategy(args.fold_chance)
+
+    executor = ProcessPoolExecutor(args.processes) if args.processes else None
+    try:
+        stats = simulate(args.tables, args.hands, strategy_factory=factory, seats=args.seats,
+                         batch_size=args.batch_size, max_delay=args.max_delay, executor=executor)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    print(stats.report())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+from deck.deck import parse_cards
+from eval.categories import category_histogram
+from eval.handvalue import HandValue
+from eval.pokerhand import PokerHand
+import itertools
+import unittest
+
+class TestCategories(unittest.TestCase):
+    def test_matches_pokerhand(self):
+        board = list(parse_cards('2h7h9cJd'))
+        combos = ['AhKh', 'QsQc', '9s9d', '7c8c', 'Jh2c']
+        out = category_histogram(board, combos)
+
+        #case 1: every combo is typed on every river, just as PokerHand would
+        for i, combo in enumerate(combos):
+            expected = [0] * (HandValue.HV_STR_FLUSH + 1)
+            held = list(parse_cards(combo))
+            for river in range(52):
+                if river in board or river in held:
+                    continue
+                a = PokerHand()
+                a.add_cards(board + held + [river], None)
+                expected[a.get_hand_value().type] += 1
+            self.assertTrue(out.counts[i] == expected)
+
+        #case 2: the totals add up over the range
+        self.assertTrue(sum(out.total) == 5 * 46)
+        self.assertTrue(out.total[HandValue.HV_FLUSH] == 9)
+
+    def test_range(self):
+        # every heart combo on a two heart flop
+        hearts = [c for c in range(52) if c % 4 == 2]
+        combos = [list(pair) for pair in itertools.combinations(hearts, 2)]
+        out = category_histogram('Ah7h2c', combos, dead='Kc')
+
+        #case 1: combos using a board card are dropped
+        self.assertTrue(len(out.combos) == len(combos) - 23)
+
+        #case 2: with four hearts held, one of the nine hearts left in 46 cards makes a flush,
+        # and the paired boards add a few full houses
+        made = 1.0 - (37.0 * 36.0) / (46.0 * 45.0)
+        self.assertTrue(out.fraction_at_least(HandValue.HV_FLUSH) >= made)
+        self.assertTrue(out.fraction_at_least(HandValue.HV_FLUSH) < made + 0.02)
+        self.assertTrue(out.fraction_at_least(HandValue.HV_HIGH_CARD) == 1.0)
+        self.assertTrue(out.fraction(HandValue.HV_STR_FLUSH, 0) > 0)
+
+        #case 3: a range can be a single string
+        out2 = category_histogram('Ah7h2c', 'KhQh  3h4h', dead='Kc')
+        self.assertTrue(len(out2.combos) == 2)
+
+    def test_errors(self):
+        #case 1: bad boards are rejected
+        self.assertRaises(ValueError, category_histogram, 'AhAh2c', ['KsKd'])
+        self.assertRaises(ValueError, category_histogram, 'AhKh2c3c4c5c', ['KsKd'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+from deck.deck import parse_cards, parse_many
+from deck import combos
+import itertools
+import unittest
+
+class TestCombos(unittest.TestCase):
+    def test_rank(self):
+        #case 1: the subset counts match the usual numbers
+        self.assertTrue(combos.num_subsets(2) == 1326)
+        self.assertTrue(combos.num_subsets(3) == 22100)
+        self.assertTrue(combos.num_subsets(5) == 2598960)
+
+        #case 2: every pair gets a distinct dense rank, in colex order
+        ranks = [combos.rank_cards(pair) for pair in itertools.combinations(range(52), 2)]
+        self.assertTrue(sorted(ranks) == list(range(1326)))
+        self.assertTrue(combos.rank_cards([0, 1]) == 0)
+        self.assertTrue(combos.rank_cards([50, 51]) == 1325)
+
+        #case 3: order of the input doesn't matter, masks rank the same
+        cards = list(parse_cards('AhKs2c7d9h'))
+        mask = sum(1 << c for c in cards)
+        self.assertTrue(combos.rank_cards(cards) == combos.rank_cards(reversed(cards)))
+        self.assertTrue(combos.rank_cards(cards) == combos.rank_mask(mask))
+
+        #case 4: bad sets are rejected
+        self.assertRaises(ValueError, combos.rank_cards, [3, 3])
+        self.assertRaises(ValueError, combos.rank_cards, [52])
+
+    def test_unrank(self):
+        #case 1: unranking inverts ranking
+        for k in (1, 2, 3, 5, 7):
+            for rank in (0, 1, 17, combos.num_subsets(k) // 2, combos.num_subsets(k) - 1):
+                cards = combos.unrank_cards(rank, k)
+                self.assertTrue(len(cards) == k)
+                self.assertTrue(cards == sorted(set(cards)))
+                self.assertTrue(combos.rank_cards(cards) == rank)
+                self.assertTrue(combos.rank_mask(combos.unrank_mask(rank, k)) == rank)
+
+        #case 2: out of range ranks are rejected
+        self.assertRaises(ValueError, combos.unrank_cards, 1326, 2)
+        self.assertRaises(ValueError, combos.unrank_cards, -1, 2)
+
+    def test_many(self):
+        indices, offsets = parse_many(b'AhKs 2c2d QsJs')
+
+        #case 1: bulk ranking agrees with single ranking
+        ranks = combos.rank_many(indices, 2)
+        self.assertTrue(list(ranks) == [combos.rank_cards(indices[i:i + 2]) for i in (0, 2, 4)])
+
+        #case 2: bulk unranking gives the sorted cards back, with and without the tables
+        cards = combos.unrank_many(ranks, 2)
+        self.assertTrue(list(cards[0:2]) == sorted(indices[0:2]))
+        fives = [combos.rank_cards(c) for c in ([0, 5, 9, 30, 51], [1, 2, 3, 4, 5])]
+        self.assertTrue(list(combos.unrank_many(fives, 5)) == [0, 5, 9, 30, 51, 1, 2, 3, 4, 5])
+        flop = combos.rank_cards([7, 8, 40])
+        self.assertTrue(list(combos.unrank_many([flop], 3)) == [7, 8, 40])
+
+        #case 3: masks rank in bulk
+        masks = [(1 << 3) | (1 << 40), (1 << 0) | (1 << 1)]
+        self.assertTrue(list(combos.rank_masks(masks)) == [combos.rank_cards([3, 40]), 0])
+
+        #case 4: ragged input is rejected
+        self.assertRaises(ValueError, combos.rank_many, indices[:3], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+from deck.deck import Card, Deck
+from eval.batch import evaluate_hand, evaluate_masks
+from eval.compacthand import CompactHand, HandArray
+from eval.hand import Hand
+from eval.handvalue import HandValue
+from eval.pokerhand import PokerHand
+import random
+import unittest
+
+class TestCompactHand(unittest.TestCase):
+    def test_matches_pokerhand(self):
+        rng = random.Random(1234)
+        fixed = ['AhKhQhJhTh', 'Ad2d3d4d5d6d', 'AhAdAsAcTh6d', 'AhAdKsKcKh6d', 'AhAdKhJh5h6h',
+                 'Ah2d3s4d5hKh', 'Ah2d3s5d5h5s', 'AhAd3s3d4h5s', 'AhAd2sJd4h5s', 'AhQd2sJd4h5s',
+                 'AsKsQsJs9s8h7h6h5h4h', 'KhKdKs5h5d5s2c', '']
+
+        hands = fixed + [rng.sample(range(52), rng.randint(1, 9)) for i in range(3000)]
+        for cards in hands:
+            a = PokerHand()
+            a.add_cards(cards, None)
+            b = CompactHand()
+            b.add_cards(cards)
+            old = a.get_hand_value()
+            new = b.get_hand_value()
+
+            #case 1: every field of the hand value matches the PokerHand
+            self.assertTrue((old.type, old.primary, old.secondary, old.tertiary) ==
+                            (new.type, new.primary, new.secondary, new.tertiary))
+            self.assertTrue(old.get_canonical() == b.get_canonical())
+
+            #case 2: the batch path agrees
+            self.assertTrue(evaluate_hand(list(b.card_indices())) == b.get_canonical())
+
+    def test_compact_hand(self):
+        a = CompactHand()
+
+        #case 1: cards can be added by name, index or object, duplicates are refused
+        a.add_cards('AhKh')
+        a.add_cards([0, Card('Qh')])
+        self.assertTrue(len(a) == 4)
+        self.assertTrue(a.add_cards(['Ah']) == -1)
+        self.assertTrue(a.add_cards(['Xx']) == -1)
+        self.assertTrue(len(a) == 4)
+
+        #case 2: cards taken from a deck can't be taken twice
+        deck = Deck()
+        b = CompactHand()
+        b.add_cards('JhTh', deck)
+        c = CompactHand()
+        c.add_cards('JhTh9h', deck)
+        self.assertTrue(len(c) == 1)
+        self.assertTrue(len(deck) == 49)
+
+        #case 3: merge makes a straight flush, overlap is reported
+        a.merge(b)
+        self.assertTrue(a.get_hand_value().type == HandValue.HV_STR_FLUSH)
+        self.assertTrue(a.merge(b) == -1)
+        self.assertTrue(len(a) == 6)
+
+        #case 4: converting to and from a Hand keeps the cards
+        h = a.to_hand()
+        self.assertTrue(len(h) == 6)
+        self.assertTrue(CompactHand.from_hand(h) == a)
+        self.assertTrue(a.to_hand(Hand).mask == h.mask)
+
+    def test_hand_array(self):
+        hands = HandArray()
+        a = CompactHand()
+        a.add_cards('AhAdAsAc2h')
+        hands.append(a)
+        b = PokerHand()
+        b.add_cards('2h3h4h5h7h', None)
+        hands.append(b)
+        hands.append(CompactHand().mask)
+
+        #case 1: hands come back as compact hands
+        self.assertTrue(len(hands) == 3)
+        self.assertTrue(hands[0] == a)
+        self.assertTrue(len(hands[2]) == 0)
+
+        #case 2: bulk evaluation matches single evaluation
+        values = hands.canonicals()
+        self.assertTrue(values[0] == a.get_canonical())
+        self.assertTrue(values[1] == b.get_hand_value().get_canonical())
+        self.assertTrue(list(values) == evaluate_masks(hands.masks))
+
+if __name__ == '__main__':
+    unittest.main()
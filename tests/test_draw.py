@@ -0,0 +1,79 @@
+from deck.deck import Card, parse_cards
+from eval.draw import analyze_hand, analyze_hands, best_hold, hold_counts
+from eval.handvalue import HandValue
+from eval.maskeval import Evaluator, suit_masks
+import itertools
+import unittest
+
+# jacks or better, 9/6
+PAYTABLE = { HandValue.HV_PAIR: 1, HandValue.HV_TWO_PAIR: 2, HandValue.HV_TRIPS: 3,
+             HandValue.HV_STRAIGHT: 4, HandValue.HV_FLUSH: 6, HandValue.HV_FULL_HOUSE: 9,
+             HandValue.HV_QUADS: 25, HandValue.HV_STR_FLUSH: 50 }
+
+def brute_force(held, discarded):
+    counts = [0] * (HandValue.HV_STR_FLUSH + 1)
+    stub = [c for c in range(52) if c not in held and c not in discarded]
+    for draw in itertools.combinations(stub, 5 - len(held)):
+        counts[Evaluator.hand_type(*suit_masks(list(held) + list(draw)))] += 1
+    return counts
+
+class TestDraw(unittest.TestCase):
+    def test_counts(self):
+        cards = list(parse_cards('AhKhQhJh2c'))
+
+        #case 1: counting matches dealing out every draw
+        for hold in ([0, 1, 2, 3], [0, 1, 2], [0, 4], [4], [0, 1, 2, 3, 4]):
+            held = [cards[i] for i in hold]
+            discarded = [c for c in cards if c not in held]
+            self.assertTrue(hold_counts(held, discarded)[0] == brute_force(held, discarded))
+
+        #case 2: a paired hand with mixed suits
+        cards = list(parse_cards('7s7d8c9hTs'))
+        for hold in ([0, 1], [2, 3, 4], [0, 2, 3, 4]):
+            held = [cards[i] for i in hold]
+            discarded = [c for c in cards if c not in held]
+            self.assertTrue(hold_counts(held, discarded)[0] == brute_force(held, discarded))
+
+    def test_analyze(self):
+        results = analyze_hand('AhKhQhJh2c', PAYTABLE, min_pair=Card.CV_JACK)
+
+        #case 1: every hold is reported, each covering every possible draw
+        self.assertTrue(len(results) == 32)
+        self.assertTrue(results[0].total == 1533939)
+        self.assertTrue(results[31].total == 1)
+        self.assertTrue(results[0b01111].total == 47)
+
+        #case 2: four to a royal is the best play, and nine of its draws make a flush
+        best = best_hold('AhKhQhJh2c', PAYTABLE, min_pair=Card.CV_JACK)
+        self.assertTrue(sorted(best.held) == sorted(parse_cards('AhKhQhJh')))
+        self.assertTrue(best.counts[HandValue.HV_FLUSH] == 8)
+        self.assertTrue(best.counts[HandValue.HV_STR_FLUSH] == 1)
+        self.assertTrue(best.counts[HandValue.HV_PAIR] == 12)
+        self.assertTrue(abs(best.ev - (8 * 6 + 50 + 12 + 3 * 4) / 47.0) < 1e-9)
+
+        #case 3: low pairs only pay with the qualifier off
+        low = analyze_hand('7s7d8c9hTs', PAYTABLE, min_pair=Card.CV_JACK)[31]
+        self.assertTrue(low.ev == 0.0)
+        low = analyze_hand('7s7d8c9hTs', PAYTABLE)[31]
+        self.assertTrue(low.ev == 1.0)
+
+    def test_batch(self):
+        hands = ['AhKhQhJh2c', 'AsKsQsJs2d', '7s7d8c9hTs']
+        out = analyze_hands(hands, PAYTABLE, min_pair=Card.CV_JACK)
+
+        #case 1: suit relabelled hands get the same answers
+        self.assertTrue([r.ev for r in out[0]] == [r.ev for r in out[1]])
+
+        #case 2: dead cards change the counts
+        live = analyze_hand(hands[0], PAYTABLE)[0b01111]
+        dead = analyze_hand(hands[0], PAYTABLE, dead='Th')[0b01111]
+        self.assertTrue(dead.total == 46)
+        self.assertTrue(dead.counts[HandValue.HV_STR_FLUSH] == 0)
+        self.assertTrue(live.counts[HandValue.HV_STR_FLUSH] == 1)
+
+        #case 3: bad hands are rejected
+        self.assertRaises(ValueError, analyze_hand, 'AhKhQhJh', PAYTABLE)
+        self.assertRaises(ValueError, analyze_hand, 'AhKhQhJh2c', PAYTABLE, dead='Ah')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+from eval.equity import adaptive_equity, exact_equity, normal_quantile, EquitySpot
+import random
+import unittest
+
+class TestEquity(unittest.TestCase):
+    def test_exact(self):
+        #case 1: a finished board is a single showdown
+        out = adaptive_equity(['AhAd', 'KsKc'], board='2c7d9hJsQc')
+        self.assertTrue(out.exact)
+        self.assertTrue(out.trials == 1)
+        self.assertTrue(out.equities == [1.0, 0.0])
+
+        #case 2: a chopped board splits the pot
+        out = adaptive_equity(['2h3d', '2c3s'], board='AhKdQsJcTh')
+        self.assertTrue(out.equities == [0.5, 0.5])
+
+        # cards outside the best five don't break the tie
+        out = adaptive_equity(['Kc2d', 'Kh3d'], board='AsAd9c8h7s')
+        self.assertTrue(out.equities == [0.5, 0.5])
+        out = adaptive_equity(['2c3d', '2h4d'], board='AsKd9c8h6s')
+        self.assertTrue(out.equities == [0.5, 0.5])
+
+        #case 3: eight flush cards and six overcards win on the river, with the 3h dead
+        out = adaptive_equity(['AhKh', 'QsQc'], board='2h7h9cJd', dead='3h')
+        self.assertTrue(out.exact)
+        self.assertTrue(out.trials == 43)
+        self.assertTrue(abs(out.equities[0] - 14.0 / 43) < 1e-9)
+        self.assertTrue(abs(sum(out.equities) - 1.0) < 1e-9)
+
+    def test_sampled(self):
+        # force sampling on a flop so the estimate can be checked against enumeration
+        holes = ['AhKh', 'QsQc', '8d9d']
+        exact = exact_equity(EquitySpot(holes, '2h7hTd'))
+        out = adaptive_equity(holes, '2h7hTd', tolerance=0.02, exhaustive_limit=0,
+                              rng=random.Random(11))
+
+        #case 1: sampling stops once the interval is tight enough
+        self.assertFalse(out.exact)
+        self.assertTrue(out.max_error() < 0.02)
+        self.assertTrue(out.trials < exact.trials * 20)
+
+        #case 2: the estimate lands near the exact answer
+        for estimate, truth in zip(out.equities, exact.equities):
+            self.assertTrue(abs(estimate - truth) < 0.03)
+
+        #case 3: preflop aces against kings is about 82%
+        out = adaptive_equity(['AhAd', 'KsKc'], tolerance=0.01, rng=random.Random(3))
+        self.assertTrue(abs(out.equities[0] - 0.82) < 0.02)
+
+    def test_errors(self):
+        #case 1: repeated cards are rejected
+        self.assertRaises(ValueError, adaptive_equity, ['AhAd', 'AhKc'])
+        self.assertRaises(ValueError, adaptive_equity, ['AhAd', 'KsKc'], board='2c3c4c5c6c7c')
+
+        #case 2: sampling needs at least one runout
+        self.assertRaises(ValueError, adaptive_equity, ['AhAd', 'KsKc'], max_trials=0)
+
+        #case 3: a complete board is scored outright even when sampling is forced
+        out = adaptive_equity(['AhAd', 'KsKc'], board='2c7d9hJsQc', exhaustive_limit=0)
+        self.assertTrue(out.exact and out.trials == 1 and out.equities == [1.0, 0.0])
+
+        #case 4: a single sweep can't estimate its error
+        out = adaptive_equity(['AhAd', 'KsKc'], exhaustive_limit=0, max_trials=1,
+                              rng=random.Random(1))
+        self.assertTrue(out.errors is None and out.max_error() is None)
+
+        #case 5: the usual z values
+        self.assertTrue(abs(normal_quantile(0.95) - 1.96) < 0.001)
+        self.assertTrue(abs(normal_quantile(0.99) - 2.576) < 0.001)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,4 @@
-from deck.deck import Deck, Card
+from deck.deck import Deck, Card, CardParseError, parse_cards, parse_many
 from eval.hand import Hand
 from eval.handvalue import HandValue
 from eval.pokerhand import PokerHand
@@ -61,6 +61,15 @@ class TestDeckFunctions(unittest.TestCase):
         x.shuffle()
         self.assertTrue(len(x) == 52-5)
 
+        #case 8:  take several cards in one pass, mixed Card objects and indices
+        x = Deck()
+        self.assertTrue(x.take_cards([Card(0), 5, 51]) is None)
+        self.assertTrue(len(x) == 49 and 5 not in x.pile)
+
+        #case 9:  nothing is taken if any of the cards is already gone
+        self.assertTrue(x.take_cards([1, 5]) == -1)
+        self.assertTrue(len(x) == 49)
+
     def test_restore(self):
         x = Deck()
         x.shuffle()
@@ -72,6 +81,35 @@ class TestDeckFunctions(unittest.TestCase):
         z.shuffle()
         self.assertFalse(z.deck_state() == x.deck_state())
 
+    def test_parse(self):
+        #case 1: parse a hand string into canonical indices, in any case
+        x = parse_cards('AhKs2c')
+        self.assertTrue(list(x) == [Card('Ah').get_index(), Card('Ks').get_index(), 0])
+        self.assertTrue(list(parse_cards('aHkS2C')) == list(x))
+        self.assertTrue(list(parse_cards(b'AhKs2c')) == list(x))
+
+        #case 2: bad and repeated cards raise instead of returning -1
+        self.assertRaises(CardParseError, parse_cards, 'AhXs')
+        self.assertRaises(CardParseError, parse_cards, 'AhK')
+        self.assertRaises(CardParseError, parse_cards, 'AhKsAh')
+
+        #case 3: parse a list of hands in one call
+        indices, offsets = parse_many(['AhKs', 'QdQcJh', ''])
+        self.assertTrue(list(offsets) == [0, 2, 5, 5])
+        self.assertTrue(list(indices[offsets[1]:offsets[2]]) == list(parse_cards('QdQcJh')))
+
+        #case 4: parse a buffer of whitespace separated hands
+        indices2, offsets2 = parse_many(b'AhKs\nQdQcJh\n')
+        self.assertTrue(list(indices2) == list(indices))
+        self.assertTrue(list(offsets2) == [0, 2, 5])
+
+        #case 5: errors name the hand they came from
+        try:
+            parse_many(b'AhKs AhAh')
+            self.fail()
+        except CardParseError as e:
+            self.assertTrue('hand 1' in str(e))
+
 class TestHandFunctions(unittest.TestCase):
     def test_hand(self):
         x = Hand()
@@ -112,6 +150,11 @@ class TestHandFunctions(unittest.TestCase):
         z.add_cards('AhAdAs2d5d', base_deck)
         self.assertTrue(len(z) == 1)
 
+        #case 9: unknown names are rejected
+        z = Hand()
+        self.assertTrue(z.add_cards(['Ah', 'Xx'], None) == -1)
+        self.assertTrue(len(z) == 1)
+
 class TestPokerHandFunctions(unittest.TestCase):
     def test_str_flush(self):
         x = PokerHand()
@@ -428,5 +471,53 @@ class TestPokerHandFunctions(unittest.TestCase):
         out = a.get_hand_value()
         self.assertTrue(out.type == HandValue.HV_HIGH_CARD)
 
+    def test_canonical(self):
+        a = PokerHand()
+        b = PokerHand()
+
+        #case 1: the best flush still loses to the worst full house
+        a.add_cards('AsKsQsJs9s', None)
+        b.add_cards('2h2d2c3s3d', None)
+        self.assertTrue(a.get_hand_value().get_canonical() < b.get_hand_value().get_canonical())
+
+        #case 2: a flush beats the best straight
+        c = PokerHand()
+        c.add_cards('AhKdQsJcTh', None)
+        self.assertTrue(a.get_hand_value().get_canonical() > c.get_hand_value().get_canonical())
+
+        #case 3: flushes with the same values tie regardless of suit
+        d = PokerHand()
+        d.add_cards('AhKhQhJh9h', None)
+        self.assertTrue(a.get_hand_value().get_canonical() == d.get_hand_value().get_canonical())
+
+        #case 4: a better flush kicker wins
+        e = PokerHand()
+        e.add_cards('AdKdQdJd8d', None)
+        self.assertTrue(a.get_hand_value().get_canonical() > e.get_hand_value().get_canonical())
+
+    def test_seven_card_chops(self):
+        # pairs of seven card hands that play the same five cards, and must split
+        chops = [('AsAd9c8h7s', 'Kc2d', 'Kh3d'),      # pair, the low cards don't play
+                 ('AsKd9c8h6s', '2c3d', '2h4d'),      # high card, the board plays
+                 ('AsAdAc8h7s', 'Kc2d', 'Kh3d'),      # trips, two kickers
+                 ('AsAdKcKh7s', 'Qc2d', 'Qh3d'),      # two pair, one kicker
+                 ('AsAdAcAh7s', 'Kc2d', 'Kh3d')]      # quads, one kicker
+
+        for board, first, second in chops:
+            a = PokerHand()
+            a.add_cards(board + first, None)
+            b = PokerHand()
+            b.add_cards(board + second, None)
+
+            #case 1: the hands tie
+            self.assertTrue(a.get_hand_value().get_canonical() == b.get_hand_value().get_canonical())
+
+        #case 2: a kicker that does play still wins
+        a = PokerHand()
+        a.add_cards('AsAd9c8h7sKc2d', None)
+        b = PokerHand()
+        b.add_cards('AsAd9c8h7sTc2d', None)
+        self.assertTrue(a.get_hand_value().get_canonical() > b.get_hand_value().get_canonical())
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,95 @@
+from eval import maskeval
+from eval.maskeval import Evaluator, MaskEvaluator, build_tables, load_tables, save_tables, suit_masks
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import warnings
+
+class TestMaskEval(unittest.TestCase):
+    def test_tables(self):
+        #case 1: rebuilding the tables gives the same block the module evaluator uses
+        flat = build_tables()
+        self.assertTrue(flat == Evaluator.flat)
+
+        #case 2: the wheel straight flush beats quad aces
+        self.assertTrue(Evaluator.canonical(*suit_masks([48, 0, 4, 8, 12])) >
+                        Evaluator.canonical(*suit_masks([48, 49, 50, 51, 44])))
+
+    def test_lazy_tables(self):
+        scratch = tempfile.mkdtemp()
+        try:
+            path = os.path.join(scratch, 'tables.bin')
+            save_tables(path)
+
+            #case 1: a saved table file loads back unchanged
+            self.assertTrue(load_tables(path) == build_tables())
+
+            #case 2: an evaluator with no tables fetches them on first use
+            lazy = MaskEvaluator()
+            self.assertFalse('flat' in lazy.__dict__)
+            self.assertTrue(lazy.evaluate_cards([0, 4, 8, 12, 48]) ==
+                            Evaluator.evaluate_cards([0, 4, 8, 12, 48]))
+            self.assertTrue('flat' in lazy.__dict__)
+
+            #case 3: a fresh interpreter doesn't build tables at import, and uses the table
+            # file named in the environment
+            check = ("import sys, eval.batch, eval.maskeval as m; "
+                     "assert 'flat' not in m.Evaluator.__dict__; "
+                     "m.build_tables = None; "
+                     "print(eval.batch.evaluate_hand([0, 4, 8, 12, 48]))")
+            root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            env = dict(os.environ)
+            env['PYPOKER_TABLES'] = path
+            out = subprocess.check_output([sys.executable, '-c', check], cwd=root, env=env)
+            self.assertTrue(int(out) == Evaluator.evaluate_cards([0, 4, 8, 12, 48]))
+
+            #case 4: a bad table file is refused
+            with open(path, 'wb') as f:
+                f.write(b'not a table file')
+            self.assertRaises(ValueError, load_tables, path)
+        finally:
+            shutil.rmtree(scratch)
+
+    def test_stale_tables(self):
+        scratch = tempfile.mkdtemp()
+        saved_env = os.environ.get(maskeval.TABLE_ENV)
+        try:
+            path = os.path.join(scratch, 'tables.bin')
+            save_tables(path)
+            with open(path, 'rb') as f:
+                good = f.read()
+
+            #case 1: a file from another table build version is refused
+            header = list(maskeval.TABLE_HEADER.unpack(good[:maskeval.TABLE_HEADER.size]))
+            header[4] ^= 1
+            with open(path, 'wb') as f:
+                f.write(maskeval.TABLE_HEADER.pack(*header) + good[maskeval.TABLE_HEADER.size:])
+            self.assertRaises(ValueError, load_tables, path)
+
+            #case 2: so is a corrupted table block
+            bad = bytearray(good)
+            bad[-1] ^= 1
+            with open(path, 'wb') as f:
+                f.write(bad)
+            self.assertRaises(ValueError, load_tables, path)
+
+            #case 3: a file named in the environment that can't be used warns, and the
+            # tables are built instead
+            os.environ[maskeval.TABLE_ENV] = path
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                flat = maskeval.default_tables()
+            self.assertTrue(flat == build_tables())
+            self.assertTrue(len(caught) == 1 and issubclass(caught[0].category, RuntimeWarning))
+        finally:
+            if saved_env is None:
+                os.environ.pop(maskeval.TABLE_ENV, None)
+            else:
+                os.environ[maskeval.TABLE_ENV] = saved_env
+            shutil.rmtree(scratch)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from eval import batch
+from eval.maskeval import Evaluator
+
+try:
+    from eval import sharedtables
+    from multiprocessing import shared_memory
+except ImportError:
+    sharedtables = None
+
+# run in a fresh interpreter so the worker really attaches to another process's block
+WORKER = """
+import sys
+from eval.sharedtables import SharedTables
+masks = [int(x) for x in sys.argv[3:]]
+if sys.argv[1] == 'name':
+    tables = SharedTables.attach(name=sys.argv[2])
+else:
+    tables = SharedTables.attach(path=sys.argv[2])
+print(' '.join(str(v) for v in tables.evaluate_masks(masks)))
+tables.close()
+"""
+
+# a worker that installs the block and evaluates card lists through eval.batch, with table
+# building and loading disabled so any attempt to fetch tables of its own would fail
+INSTALLED_WORKER = """
+import sys
+from eval import batch, maskeval, sharedtables
+maskeval.build_tables = None
+maskeval.default_tables = None
+sharedtables.build_tables = None
+tables = sharedtables.SharedTables.attach(name=sys.argv[1]).install()
+masks = [int(x) for x in sys.argv[2:]]
+hands = [[c for c in range(52) if mask & (1 << c)] for mask in masks]
+print(' '.join(str(v) for v in batch.evaluate_hands(hands)))
+tables.close()
+"""
+
+def random_masks(count, seed):
+    rng = random.Random(seed)
+    return [sum(1 << c for c in rng.sample(range(52), rng.randint(5, 7))) for i in range(count)]
+
+@unittest.skipIf(sharedtables is None, "shared tables need python 3.8")
+class TestSharedTables(unittest.TestCase):
+    def run_worker(self, kind, where, masks):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        out = subprocess.check_output([sys.executable, '-c', WORKER, kind, where] +
+                                      [str(m) for m in masks], cwd=root)
+        return [int(x) for x in out.split()]
+
+    def test_shared_memory(self):
+        masks = random_masks(500, 5)
+        local = [Evaluator.evaluate_mask(m) for m in masks]
+
+        with sharedtables.SharedTables.create(cache_masks=masks[:100], cache_slots=256) as owner:
+            #case 1: cached entries come back, uncached masks miss
+            self.assertTrue(owner.lookup(masks[0]) == local[0])
+            self.assertTrue(owner.lookup(masks[400]) in (-1, local[400]))
+
+            #case 2: an attached view is read-only and evaluates bit for bit like local tables
+            worker = sharedtables.SharedTables.attach(name=owner.name)
+            self.assertTrue(worker.evaluate_masks(masks) == local)
+            self.assertRaises(TypeError, worker.cache.__setitem__, 0, 1)
+            worker.close()
+
+            #case 3: so does a separate process
+            self.assertTrue(self.run_worker('name', owner.name, masks[:50]) == local[:50])
+
+            #case 4: a worker that installs the block evaluates through eval.batch without
+            # ever building tables
+            root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            out = subprocess.check_output([sys.executable, '-c', INSTALLED_WORKER, owner.name] +
+                                          [str(m) for m in masks[:50]], cwd=root)
+            self.assertTrue([int(x) for x in out.split()] == local[:50])
+
+    def test_install(self):
+        masks = random_masks(200, 11)
+        local = [Evaluator.evaluate_mask(m) for m in masks]
+        owner = sharedtables.SharedTables.create(cache_masks=masks[:50], cache_slots=128)
+        worker = sharedtables.SharedTables.attach(name=owner.name)
+        try:
+            #case 1: once installed, the shared Evaluator reads the block and batch checks the cache
+            worker.install()
+            self.assertTrue(Evaluator.flat is worker.evaluator.flat)
+            self.assertTrue(batch.ResultCache is worker)
+            self.assertTrue(batch.evaluate_masks(masks) == local)
+            hands = [[c for c in range(52) if m & (1 << c)] for m in masks]
+            self.assertTrue(batch.evaluate_hands(hands) == local)
+        finally:
+            worker.close()
+            owner.close()
+
+        #case 2: closing uninstalls, and the Evaluator fetches its own tables again
+        self.assertTrue(batch.ResultCache is None)
+        self.assertTrue(batch.evaluate_masks(masks) == local)
+
+    def test_mapped_file(self):
+        masks = random_masks(200, 9)
+        local = [Evaluator.evaluate_mask(m) for m in masks]
+        scratch = tempfile.mkdtemp()
+        try:
+            path = os.path.join(scratch, 'tables.bin')
+            owner = sharedtables.SharedTables.create(path=path, cache_masks=masks, cache_slots=512)
+
+            #case 1: a file block works the same way, in this process and another one
+            self.assertTrue(owner.evaluate_masks(masks) == local)
+            self.assertTrue(self.run_worker('path', path, masks) == local)
+            owner.close()
+
+            #case 2: a file that isn't a table block is refused
+            with open(path, 'wb') as f:
+                f.write(b'\0' * 100)
+            self.assertRaises(ValueError, sharedtables.SharedTables.attach, path=path)
+
+            #case 3: so is one too short to hold a header
+            with open(path, 'wb') as f:
+                f.write(b'\0' * 10)
+            self.assertRaises(ValueError, sharedtables.SharedTables.attach, path=path)
+        finally:
+            shutil.rmtree(scratch)
+
+if __name__ == '__main__':
+    unittest.main()
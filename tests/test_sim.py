@@ -0,0 +1,76 @@
+import unittest
+
+try:
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    from sim import simulator
+except (ImportError, SyntaxError):
+    simulator = None
+
+@unittest.skipIf(simulator is None, "the simulator needs python 3 asyncio")
+class TestSimulator(unittest.TestCase):
+    def test_batches_across_tables(self):
+        stats = simulator.simulate(50, 4, seats=3)
+
+        #case 1: every hand is played and timed, and calling stations always reach showdown
+        self.assertTrue(stats.hands == 200)
+        self.assertTrue(stats.showdowns == 200)
+        self.assertTrue(len(stats.latencies) == 200)
+
+        #case 2: showdowns from different tables share evaluation batches
+        self.assertTrue(stats.batches < stats.showdowns)
+        self.assertTrue(stats.percentile(50) <= stats.percentile(99))
+        self.assertTrue(stats.hands_per_sec() > 0)
+
+    def test_percentile(self):
+        #case 1: nearest rank, the smallest value with at least pct percent at or below it
+        stats = simulator.SimulationStats(5, 0, 0, 1, [5, 1, 4, 2, 3])
+        self.assertTrue(stats.percentile(50) == 3)
+        self.assertTrue(stats.percentile(20) == 1)
+        self.assertTrue(stats.percentile(21) == 2)
+        self.assertTrue(stats.percentile(99) == 5)
+        self.assertTrue(stats.percentile(0) == 1)
+
+        #case 2: an even count and no samples at all
+        stats = simulator.SimulationStats(4, 0, 0, 1, [10, 20, 30, 40])
+        self.assertTrue(stats.percentile(50) == 20)
+        self.assertTrue(stats.percentile(90) == 40)
+        self.assertTrue(simulator.SimulationStats(0, 0, 0, 1, []).percentile(50) == 0.0)
+
+        #case 3: every whole percentile of 100 samples is that sample, and fractional
+        # percentiles round up to the next rank
+        stats = simulator.SimulationStats(100, 0, 0, 1, list(range(1, 101)))
+        self.assertTrue(all(stats.percentile(pct) == pct for pct in range(1, 101)))
+        self.assertTrue(stats.percentile(99.5) == 100)
+        self.assertTrue(stats.percentile(7.001) == 8)
+
+    def test_executor(self):
+        with ThreadPoolExecutor(2) as pool:
+            stats = simulator.simulate(20, 3, seats=2, batch_size=8, executor=pool)
+        self.assertTrue(stats.showdowns == 60)
+
+    def test_showdown(self):
+        evaluator = simulator.BatchEvaluator(batch_size=2)
+
+        #case 1: quad aces beat two pair
+        values = asyncio.run(evaluator.evaluate([[48, 49, 50, 51, 44, 0, 1],
+                                                 [0, 1, 4, 5, 8, 9, 12]]))
+        self.assertTrue(values[0] > values[1])
+        self.assertTrue(evaluator.batches == 1)
+
+        #case 2: hands that play the same five cards split, whatever their low cards
+        values = asyncio.run(evaluator.evaluate([[48, 49, 28, 25, 22, 44, 1],
+                                                 [48, 49, 28, 25, 22, 46, 5]]))
+        self.assertTrue(values[0] == values[1])
+
+    def test_folds(self):
+        def folder():
+            return simulator.RandomStrategy(fold_chance=1.0)
+
+        #case 1: nobody reaches showdown when every seat folds
+        stats = simulator.simulate(5, 2, strategy_factory=folder)
+        self.assertTrue(stats.hands == 10)
+        self.assertTrue(stats.showdowns == 0)
+
+if __name__ == '__main__':
+    unittest.main()
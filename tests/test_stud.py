@@ -0,0 +1,128 @@
+from deck.deck import Card, parse_cards
+from eval.pokerhand import PokerHand
+from eval.stud import StudTable, bring_in_seat, high_board_seat, stud_equity, upcard_value
+import random
+import unittest
+
+class TestStud(unittest.TestCase):
+    def test_upcards(self):
+        #case 1: only pairs and better count on a partial board
+        self.assertTrue(upcard_value('2c2d') > upcard_value('AsKs'))
+        self.assertTrue(upcard_value('5c5d5h') > upcard_value('KcKdQhQs'))
+        self.assertTrue(upcard_value('KcKdQhQs') > upcard_value('AcAd3h4s'))
+        self.assertTrue(upcard_value('AhKh') > upcard_value('AsQs'))
+        self.assertTrue(upcard_value('6s7s8s9s') < upcard_value('2c2d'))
+
+        #case 2: ranks decide, not suits
+        self.assertTrue(upcard_value('AhKh') == upcard_value('AcKd'))
+        self.assertRaises(ValueError, upcard_value, '2c3c4c5c6c')
+
+        #case 3: the lowest door card brings it in, clubs lowest on a tie
+        doors = [list(parse_cards(x))[0] for x in ('9h', '2d', 'Ks', '2c')]
+        self.assertTrue(bring_in_seat(doors) == 3)
+        self.assertTrue(bring_in_seat([None, doors[0], None]) == 1)
+
+        #case 4: the best board acts first, ties to the lowest seat
+        boards = [list(parse_cards(x)) for x in ('AhKd', '7c7d', '7h7s')]
+        self.assertTrue(high_board_seat(boards) == 1)
+
+    def test_exact(self):
+        a = list(parse_cards('AhAd9c4s5h6h'))
+        b = list(parse_cards('KcKdKs2h3h8d'))
+        dead = list(parse_cards('7h8hTh'))
+        out = stud_equity([a, b], dead)
+
+        #case 1: every river is enumerated, and agrees with PokerHand
+        seen = set(a + b + dead)
+        stub = [c for c in range(52) if c not in seen]
+        wins = [0.0, 0.0]
+        for x in stub:
+            for y in stub:
+                if x == y:
+                    continue
+                hands = []
+                for cards, card in ((a, x), (b, y)):
+                    h = PokerHand()
+                    h.add_cards(cards + [card], None)
+                    hands.append(h.get_hand_value().get_canonical())
+                if hands[0] == hands[1]:
+                    wins[0] += 0.5
+                    wins[1] += 0.5
+                else:
+                    wins[hands[1] > hands[0]] += 1
+        deals = len(stub) * (len(stub) - 1)
+        self.assertTrue(out.exact and out.trials == deals)
+        self.assertTrue(abs(out.equities[0] - wins[0] / deals) < 1e-9)
+        self.assertTrue(abs(sum(out.equities) - 1.0) < 1e-9)
+
+        #case 2: sampling lands within its confidence interval of the exact answer
+        sampled = stud_equity([a, b], dead, tolerance=0.01, exhaustive_limit=0,
+                              rng=random.Random(3))
+        self.assertTrue(not sampled.exact)
+        self.assertTrue(abs(sampled.equities[0] - out.equities[0]) < 2 * sampled.errors[0] + 0.005)
+
+        #case 3: impossible spots are refused
+        self.assertRaises(ValueError, stud_equity, [a, a])
+        self.assertRaises(ValueError, stud_equity, [a + b])
+        self.assertRaises(ValueError, stud_equity, [])
+        self.assertRaises(ValueError, stud_equity, [a, b], max_trials=0)
+
+        #case 4: hands that play the same five cards split the pot, enumerated or sampled,
+        # whatever their two low cards
+        c = list(parse_cards('AsAd9c8h7sKc2d'))
+        d = list(parse_cards('AhAc9d8s7cKh3d'))
+        out = stud_equity([c, d])
+        self.assertTrue(out.exact and out.equities == [0.5, 0.5])
+        out = stud_equity([c, d], exhaustive_limit=0, max_trials=1000, rng=random.Random(2))
+        self.assertTrue(not out.exact and out.equities == [0.5, 0.5])
+
+        #case 5: a single sweep can't estimate its error
+        out = stud_equity([a, b], dead, exhaustive_limit=0, max_trials=1, rng=random.Random(1))
+        self.assertTrue(out.errors is None and out.trials == 500)
+
+    def test_table(self):
+        table = StudTable(3)
+        for seat, down in enumerate(('AhAd', None, None)):
+            if down:
+                for card in parse_cards(down):
+                    table.deal_down(seat, card)
+            else:
+                table.deal_down(seat)
+                table.deal_down(seat)
+        for seat, door in enumerate(('9c', '3d', '3c')):
+            table.deal_up(seat, door)
+
+        #case 1: bring in and seen cards
+        self.assertTrue(table.bring_in() == 2)
+        self.assertRaises(ValueError, table.deal_up, 1, '9c')
+        self.assertTrue(len(table.unseen_deck()) == 52 - 5)
+
+        #case 2: a fold moves the seat's up cards to the dead cards
+        table.fold(2)
+        table.kill('Ks')
+        self.assertTrue(table.bring_in() == 1)
+        self.assertTrue(table.visible_mask() == table.dead | table.up_mask[0] | table.up_mask[1])
+        self.assertTrue(table.dead == (1 << Card.CV_THREE * 4) | (1 << (Card.CV_KING * 4 + 3)))
+
+        #case 3: fourth street, the pair shows the high board
+        table.deal_up(0, 'Jd')
+        table.deal_up(1, '3h')
+        self.assertTrue(table.high_board() == 1)
+
+        #case 4: equity for the live seats, aces up against a pair of threes showing
+        seats, out = table.equity(tolerance=0.01, rng=random.Random(1))
+        self.assertTrue(seats == [0, 1])
+        self.assertTrue(abs(sum(out.equities) - 1.0) < 1e-9)
+        self.assertTrue(out.equities[0] > 0.5)
+
+        #case 5: bad seats, and a table where everyone has folded, are refused
+        self.assertRaises(ValueError, table.deal_up, 3, 'Qc')
+        self.assertRaises(ValueError, table.deal_up, 0, 'QcQd')
+        self.assertRaises(ValueError, table.deal_up, 2, 'Qc')
+        table.fold(0)
+        table.fold(1)
+        self.assertRaises(ValueError, table.equity)
+        self.assertRaises(ValueError, StudTable, 0)
+
+if __name__ == '__main__':
+    unittest.main()